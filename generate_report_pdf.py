@@ -1,13 +1,50 @@
 """
-Generate a professional PDF of the Strategic Complementarity Report.
+Render markdown reports to PDF with fpdf2 -- no browser involved.
 Uses fpdf2's multi_cell with markdown support for reliable text rendering.
+
+Much cheaper than the Playwright path in src/generate.py, so it suits bulk
+draft PDFs. Colours, font and margins come from a theme; a preset can tune
+them under `design: fpdf:` in its YAML.
+
+Usage:
+    python generate_report_pdf.py report.md
+    python generate_report_pdf.py report.md -o out/report.pdf --title "Q3 Review"
+    python generate_report_pdf.py drafts/*.md -o out/ --preset internal-memo --jobs 8
+
+    from generate_report_pdf import render_markdown
+    pages = render_markdown("report.md", "report.pdf")
 """
 
+import argparse
+import os
 import re
+import sys
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import accumulate, chain
+from pathlib import Path
+from typing import NamedTuple, Optional
+
 from fpdf import FPDF
 
-MD_PATH = "Strategic_Complementarity_Report_Erebor_Abaxx.md"
-PDF_PATH = "Strategic_Complementarity_Report_Erebor_Abaxx.pdf"
+try:
+    from pypdf import PdfReader
+    from pypdf.generic import (
+        ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject,
+        IndirectObject, NameObject, NumberObject, StreamObject,
+    )
+except ImportError:
+    PdfReader = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent
 
 # Colours
 NAVY = (13, 33, 55)
@@ -18,59 +55,274 @@ WHITE = (255, 255, 255)
 RULE_GREY = (213, 220, 228)
 TABLE_HEADER_BG = (13, 33, 55)
 TABLE_ALT_BG = (245, 247, 250)
-QUOTE_BORDER = (26, 82, 118)
 CODE_BG = (244, 246, 249)
 CODE_BORDER = (220, 225, 232)
 
-# Unicode -> Latin-1 safe
+
+class Theme(NamedTuple):
+    font: str = "Helvetica"   # core font family: Helvetica, Times or Courier
+    body_size: float = 9.5
+    heading: tuple = NAVY
+    accent: tuple = DARK_BLUE  # H2 rules, H3 text, quote border
+    text: tuple = DARK_TEXT
+    muted: tuple = GREY_TEXT
+    rule: tuple = RULE_GREY
+    table_header: tuple = TABLE_HEADER_BG
+    table_alt: tuple = TABLE_ALT_BG
+    margin: float = 22         # left/right, mm
+    running_header: bool = True
+
+
+DEFAULT_THEME = Theme()
+
+
+def parse_color(value):
+    """'#1a5276' or [26, 82, 118] -> (26, 82, 118)."""
+    if isinstance(value, str):
+        value = value.lstrip("#")
+        if len(value) != 6:
+            raise ValueError(f"bad colour: #{value}")
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(int(c) for c in value)
+
+
+def load_theme(preset_name):
+    """
+    Theme for a preset: DEFAULT_THEME overridden by the preset's optional
+    `design: fpdf:` mapping (Theme field names; colours as hex).
+    """
+    preset_path = PROJECT_ROOT / "presets" / f"{preset_name}.yaml"
+    if not preset_path.exists():
+        available = [p.stem for p in (PROJECT_ROOT / "presets").glob("*.yaml")]
+        raise ValueError(f"preset not found: {preset_path} (available: {', '.join(available)})")
+    if yaml is None:
+        print("Warning: PyYAML not installed. Using the default theme.", file=sys.stderr)
+        return DEFAULT_THEME
+
+    with open(preset_path, "r", encoding="utf-8") as f:
+        try:
+            preset = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"{preset_path.name}: {e}") from e
+    overrides = dict((preset.get("design") or {}).get("fpdf") or {})
+    unknown = set(overrides) - set(Theme._fields)
+    if unknown:
+        raise ValueError(f"{preset_path.name}: unknown fpdf theme keys: {', '.join(sorted(unknown))}")
+    for key, value in overrides.items():
+        if isinstance(DEFAULT_THEME._asdict()[key], tuple):
+            overrides[key] = parse_color(value)
+    return DEFAULT_THEME._replace(**overrides)
+
+
+# Unicode -> Latin-1 safe. Explicit replacements first; any other character
+# outside Latin-1 falls back to its NFKD decomposition without accents, or "?"
 UNICODE_MAP = {
     "\u2014": " -- ", "\u2013": " - ", "\u2018": "'", "\u2019": "'",
     "\u201c": '"', "\u201d": '"', "\u2026": "...", "\u00a0": " ",
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2212": "-",
+    "\u201a": ",", "\u201e": '"', "\u2032": "'", "\u2033": '"',
+    "\u2022": "-", "\u2192": "->", "\u2190": "<-", "\u2264": "<=",
+    "\u2265": ">=", "\u2248": "~", "\u20ac": "EUR", "\u200b": "", "\ufeff": "",
 }
 
+# Memo size for sanitize / md_to_fpdf_markdown (table cells and headers repeat)
+TEXT_CACHE_SIZE = 16384
+
+
+class Latin1Table(dict):
+    """str.translate table that fills in the fallback for a code point on first sight."""
+
+    def __missing__(self, cp):
+        if cp < 0x100:
+            repl = cp
+        else:
+            decomposed = unicodedata.normalize("NFKD", chr(cp))
+            repl = "".join(c for c in decomposed
+                           if ord(c) < 0x100 and not unicodedata.combining(c))
+            if not repl and not all(unicodedata.combining(c) for c in decomposed):
+                repl = "?"
+        self[cp] = repl
+        return repl
+
+
+LATIN1 = Latin1Table({ord(char): repl for char, repl in UNICODE_MAP.items()})
+
+# **bold** passes through; a *single-asterisk* span becomes fpdf2's --italic--.
+# "**" pairs are matched first, left to right, so they are never taken as
+# italic markers
+EMPHASIS_RE = re.compile(r'\*\*|\*((?:[^*]|\*\*)+?)\*(?!\*)')
+
+
+def _emphasis(m):
+    return "**" if m.group(1) is None else f"--{m.group(1)}--"
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def sanitize(text):
-    for char, repl in UNICODE_MAP.items():
-        text = text.replace(char, repl)
-    return text
+    return text.translate(LATIN1)
 
 
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def md_to_fpdf_markdown(text):
     """Convert standard markdown bold/italic to fpdf2 markdown syntax.
     fpdf2 uses **bold** (same), --italic-- (different from *italic*).
     """
     text = sanitize(text)
-    # Convert *single asterisk italic* to --fpdf italic--
-    # But avoid converting **bold** markers
-    # First protect **bold**
-    text = text.replace("**", "\x00BOLD\x00")
-    # Convert *italic* to --italic--
-    text = re.sub(r'\*([^*]+?)\*', r'--\1--', text)
-    # Restore bold
-    text = text.replace("\x00BOLD\x00", "**")
-    return text
+    if "*" not in text:
+        return text
+    return EMPHASIS_RE.sub(_emphasis, text)
+
+
+# --- Blocks ---
+#
+# Parsed markdown is a flat sequence of small immutable records. Text is kept
+# as the parser saw it except for table cells, which are sanitized once at
+# parse time and stored as tuples (repeated values interned).
+
+class Heading(NamedTuple):
+    level: int
+    text: str
+
+
+class Paragraph(NamedTuple):
+    text: str
+
+
+class Rule(NamedTuple):
+    pass
+
+
+class Table(NamedTuple):
+    headers: tuple[str, ...]
+    rows: tuple[tuple[str, ...], ...]
+    # Long tables arrive as several blocks of at most TABLE_CHUNK_ROWS rows:
+    # `continued` carries on the previous block's table, `more` is set when
+    # the next block continues this one
+    continued: bool = False
+    more: bool = False
+
+
+class Bullets(NamedTuple):
+    items: tuple[str, ...]
+
+
+class Numbered(NamedTuple):
+    items: tuple[str, ...]
+
+
+class Blockquote(NamedTuple):
+    text: str
+
+
+class Code(NamedTuple):
+    text: str
+
+
+class Sources(NamedTuple):
+    text: str
+
+
+# --- Table layout ---
+
+TABLE_LINE_H = 4.5
+# (style, size); the family comes from the theme
+TABLE_HEADER_FONT = ("B", 7.5)
+TABLE_CELL_FONT = ("", 8)
+TABLE_LABEL_FONT = ("B", 8)  # first column of multi-column tables
+TABLE_MIN_LINES = 2     # fewest lines of a row worth starting at the foot of a page
+TABLE_SPLIT_LINES = 40  # rows longer than this split at page ends instead of moving whole
+WRAP_CACHE_SIZE = 8192
+TABLE_CHUNK_ROWS = 500  # rows parsed and held at once; columns are sized on the first chunk
+
+
+class TableLayout(NamedTuple):
+    widths: tuple[float, ...]
+    offsets: tuple[float, ...]  # column x positions, relative to the table's left edge
+    header: tuple[tuple[str, ...], ...]  # wrapped lines per header cell
+    header_h: float
+    rows: tuple[tuple[str, ...], ...]  # cell text; wrapped only as each row is drawn (wrap_row)
+    start: int = 0  # index of rows[0] in the whole table, for the row striping
+    more: bool = False  # the next Table block continues these rows
+
+
+def share_width(total, lo, hi, weight):
+    """
+    Split `total` across columns in proportion to `weight`, keeping each
+    column within [lo, hi]. Columns that hit a bound are fixed there and
+    the remaining width is re-shared among the others.
+    """
+    if sum(lo) >= total:
+        return [x * total / sum(lo) for x in lo]
+    if sum(hi) <= total:
+        return [x * total / sum(hi) for x in hi]
+    widths = [None] * len(lo)
+    while True:
+        free = [i for i, cw in enumerate(widths) if cw is None]
+        if not free:
+            # Bounds clamped in both directions; settle by scaling
+            return [cw * total / sum(widths) for cw in widths]
+        room = total - sum(cw for cw in widths if cw is not None)
+        weights = sum(weight[i] for i in free)
+        clamped = False
+        for i in free:
+            share = room * weight[i] / weights
+            if share < lo[i]:
+                widths[i] = lo[i]
+                clamped = True
+            elif share > hi[i]:
+                widths[i] = hi[i]
+                clamped = True
+        if not clamped:
+            for i in free:
+                widths[i] = room * weight[i] / weights
+            return widths
 
 
 class ReportPDF(FPDF):
+    def __init__(self, *args, theme=DEFAULT_THEME, header_title=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.theme = theme
+        # Running header text; taken from the first H1 when not given
+        self.header_title = header_title
+        # (text, width, font, markdown) -> wrapped lines; see wrap()
+        self._wrap_cache = {}
+        self.table_layout = None  # last table drawn, for a continuing chunk
+        self.repeat_table_headers = True
+        # Set when this PDF is one part of a document built in parts (see
+        # build_pdf): pages are numbered after the earlier parts, and with
+        # `resumed` the first page continues the previous part's last page,
+        # which already carries the running header and footer
+        self.page_offset = 0
+        self.resumed = False
+        # Page count at which a part is closed; a table that reaches it
+        # stops at its next page break (see continue_table)
+        self.flush_pages = None
+        # The first H1 (or, failing that, the first paragraph) opens the
+        # report; a paragraph before any H1 is styled as the subtitle line
+        self.is_first = True
+
     def header(self):
-        if self.page_no() > 1:
+        if self.resumed and self.page_no() == 1:
+            return
+        if self.page_no() + self.page_offset > 1 and self.theme.running_header:
             self.set_y(8)
-            self.set_font("Helvetica", "I", 7.5)
-            self.set_text_color(*GREY_TEXT)
-            self.cell(0, 5,
-                      "Strategic Complementarity Report: Erebor Bank & Abaxx Technologies",
-                      align="R")
+            self.set_font(self.theme.font, "I", 7.5)
+            self.set_text_color(*self.theme.muted)
+            self.cell(0, 5, self.header_title or "", align="R")
             self.ln(8)
 
     def footer(self):
+        if self.resumed and self.page_no() == 1:
+            return
         self.set_y(-15)
-        self.set_font("Helvetica", "", 8)
-        self.set_text_color(*GREY_TEXT)
-        self.cell(0, 10, str(self.page_no()), align="C")
+        self.set_font(self.theme.font, "", 8)
+        self.set_text_color(*self.theme.muted)
+        self.cell(0, 10, str(self.page_no() + self.page_offset), align="C")
 
     def hr(self):
         self.ln(4)
         y = self.get_y()
-        self.set_draw_color(*RULE_GREY)
+        self.set_draw_color(*self.theme.rule)
         self.set_line_width(0.3)
         self.line(self.l_margin, y, self.w - self.r_margin, y)
         self.ln(6)
@@ -79,44 +331,44 @@ class ReportPDF(FPDF):
         text = sanitize(text)
         if level == 1:
             self.ln(12)
-            self.set_font("Helvetica", "B", 22)
-            self.set_text_color(*NAVY)
+            self.set_font(self.theme.font, "B", 22)
+            self.set_text_color(*self.theme.heading)
             self.multi_cell(0, 9, text)
             self.ln(2)
         elif level == 2:
             self.ln(6)
-            self.set_font("Helvetica", "B", 14)
-            self.set_text_color(*NAVY)
+            self.set_font(self.theme.font, "B", 14)
+            self.set_text_color(*self.theme.heading)
             self.multi_cell(0, 7, text)
             y = self.get_y() + 1
-            self.set_draw_color(*DARK_BLUE)
+            self.set_draw_color(*self.theme.accent)
             self.set_line_width(0.5)
             self.line(self.l_margin, y, self.w - self.r_margin, y)
             self.ln(5)
         elif level == 3:
             self.ln(4)
-            self.set_font("Helvetica", "B", 11.5)
-            self.set_text_color(*DARK_BLUE)
+            self.set_font(self.theme.font, "B", 11.5)
+            self.set_text_color(*self.theme.accent)
             self.multi_cell(0, 6, text)
             self.ln(2)
         elif level == 4:
             self.ln(3)
-            self.set_font("Helvetica", "B", 10.5)
+            self.set_font(self.theme.font, "B", 10.5)
             self.set_text_color(44, 62, 80)
             self.multi_cell(0, 5.5, text)
             self.ln(1.5)
 
     def body(self, text):
         text = md_to_fpdf_markdown(text)
-        self.set_font("Helvetica", "", 9.5)
-        self.set_text_color(*DARK_TEXT)
+        self.set_font(self.theme.font, "", self.theme.body_size)
+        self.set_text_color(*self.theme.text)
         self.multi_cell(0, 5, text, markdown=True)
         self.ln(2.5)
 
     def bullet(self, text):
         text = md_to_fpdf_markdown(text)
-        self.set_font("Helvetica", "", 9.5)
-        self.set_text_color(*DARK_TEXT)
+        self.set_font(self.theme.font, "", self.theme.body_size)
+        self.set_text_color(*self.theme.text)
         x0 = self.get_x()
         self.set_x(self.l_margin + 6)
         self.cell(4, 5, "-")
@@ -126,12 +378,12 @@ class ReportPDF(FPDF):
 
     def numbered(self, num, text):
         text = md_to_fpdf_markdown(text)
-        self.set_font("Helvetica", "", 9.5)
-        self.set_text_color(*DARK_TEXT)
+        self.set_font(self.theme.font, "", self.theme.body_size)
+        self.set_text_color(*self.theme.text)
         self.set_x(self.l_margin + 6)
-        self.set_font("Helvetica", "B", 9.5)
+        self.set_font(self.theme.font, "B", self.theme.body_size)
         self.cell(6, 5, f"{num}.")
-        self.set_font("Helvetica", "", 9.5)
+        self.set_font(self.theme.font, "", self.theme.body_size)
         self.multi_cell(self.w - self.l_margin - self.r_margin - 12, 5,
                         text, markdown=True)
         self.ln(1)
@@ -141,12 +393,12 @@ class ReportPDF(FPDF):
         self.ln(3)
         y_start = self.get_y()
         self.set_x(self.l_margin + 8)
-        self.set_font("Helvetica", "BI", 9.5)
+        self.set_font(self.theme.font, "BI", self.theme.body_size)
         self.set_text_color(44, 62, 80)
         self.multi_cell(self.w - self.l_margin - self.r_margin - 12, 5.5,
                         text, markdown=True)
         y_end = self.get_y() + 2
-        self.set_draw_color(*QUOTE_BORDER)
+        self.set_draw_color(*self.theme.accent)
         self.set_line_width(1.0)
         self.line(self.l_margin + 3, y_start, self.l_margin + 3, y_end)
         self.set_y(y_end)
@@ -169,289 +421,818 @@ class ReportPDF(FPDF):
         self.rect(self.l_margin, y0, w, block_h, style="DF")
         self.set_y(y0 + 3)
         self.set_font("Courier", "", 7.5)
-        self.set_text_color(*DARK_TEXT)
+        self.set_text_color(*self.theme.text)
         for line in lines:
             self.set_x(self.l_margin + 4)
             self.cell(w - 8, line_h, line)
             self.ln(line_h)
         self.ln(3)
 
-    def render_table(self, headers, rows):
-        self.ln(3)
-        headers = [sanitize(h) for h in headers]
-        rows = [[sanitize(c) for c in r] for r in rows]
+    # --- Tables ---
+
+    def wrap(self, text, width, markdown=False):
+        """Line breaks for text in the current font, cached on (text, width, font)."""
+        key = (text, round(width, 3), self.font_family, self.font_style,
+               self.font_size_pt, markdown)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            if len(self._wrap_cache) >= WRAP_CACHE_SIZE:
+                self._wrap_cache.clear()
+            lines = tuple(self.multi_cell(width, TABLE_LINE_H, text, markdown=markdown,
+                                          dry_run=True, output="LINES"))
+            self._wrap_cache[key] = lines
+        return lines
+
+    def _text_extent(self, text, font):
+        """(longest word, whole text) width of a cell's plain text in a font."""
+        self.set_font(self.theme.font, *font)
+        plain = text.replace("*", "")
+        words = plain.split()
+        if not words:
+            return 0.0, 0.0
+        return (self.get_string_width(max(words, key=len)),
+                self.get_string_width(" ".join(words)))
+
+    def column_widths(self, headers, rows, total):
+        """
+        Size columns from their content. Every column gets at least its
+        longest word and at most what it needs to fit each cell on one line;
+        width in between is shared in proportion to average text length.
+        """
+        n = len(headers)
+        pad = 4 + 2 * self.c_margin + 0.1
+        lo, hi, weight = [], [], []
+        for i, header in enumerate(headers):
+            word_w, line_w = self._text_extent(header.upper(), TABLE_HEADER_FONT)
+            col_lo, col_hi, col_sum, count = word_w, line_w, 0.0, 0
+            font = TABLE_LABEL_FONT if i == 0 and n > 1 else TABLE_CELL_FONT
+            for row in rows:
+                if i < len(row):
+                    word_w, line_w = self._text_extent(row[i], font)
+                    col_lo = max(col_lo, word_w)
+                    col_hi = max(col_hi, line_w)
+                    col_sum += line_w
+                    count += 1
+            lo.append(col_lo + pad)
+            hi.append(col_hi + pad)
+            weight.append(col_sum / count + 1 if count else 1)
+        return share_width(total, lo, hi, weight)
+
+    def layout_table(self, headers, rows):
+        """
+        Measure a table once: column geometry and the wrapped header. Body
+        rows are wrapped lazily by wrap_row as they are drawn, so a long
+        table never holds every row's lines at once.
+        """
         w = self.w - self.l_margin - self.r_margin
         n = len(headers)
+        widths = self.column_widths(headers, rows, w) if n > 1 else [w]
+        offsets = tuple(accumulate(widths, initial=0.0))[:-1]
 
-        # Column widths
-        if n == 2:
-            cw = [w * 0.26, w * 0.74]
-        elif n == 3:
-            cw = [w * 0.20, w * 0.40, w * 0.40]
-        else:
-            cw = [w / n] * n
+        self.set_font(self.theme.font, *TABLE_HEADER_FONT)
+        header = tuple(self.wrap(h.upper(), cw - 3) for h, cw in zip(headers, widths))
+        header_h = max([1, *map(len, header)]) * TABLE_LINE_H + 4
+        return TableLayout(tuple(widths), offsets, header, header_h, tuple(rows))
 
-        line_h = 4.5
+    def wrap_row(self, layout, row):
+        """(wrapped lines per cell, line count) for one body row of a measured table."""
+        multi = len(layout.widths) > 1
+        cells = []
+        for i, (cell, cw) in enumerate(zip(row, layout.widths)):
+            self.set_font(self.theme.font, *(TABLE_LABEL_FONT if i == 0 and multi else TABLE_CELL_FONT))
+            cells.append(self.wrap(md_to_fpdf_markdown(cell), cw - 4, markdown=True))
+        return tuple(cells), max([1, *map(len, cells)])
 
-        # --- Header row ---
-        self.set_fill_color(*TABLE_HEADER_BG)
-        self.set_text_color(*WHITE)
-        self.set_font("Helvetica", "B", 7.5)
+    def _draw_lines(self, x, y, width, lines, markdown=False):
+        for k, line in enumerate(lines):
+            self.set_xy(x, y + k * TABLE_LINE_H)
+            self.cell(width, TABLE_LINE_H, line, markdown=markdown)
+
+    def _table_header(self, layout):
+        x0 = self.l_margin
         y_top = self.get_y()
-        # Measure header height
-        max_lines = 1
-        for i, h in enumerate(headers):
-            nb = self.multi_cell(cw[i] - 3, line_h, h.upper(),
-                                 dry_run=True, output="LINES")
-            max_lines = max(max_lines, len(nb))
-        row_h = max_lines * line_h + 4
-        self.rect(self.l_margin, y_top, w, row_h, style="F")
+        self.set_fill_color(*self.theme.table_header)
         self.set_text_color(*WHITE)
-        for i, h in enumerate(headers):
-            self.set_xy(self.l_margin + sum(cw[:i]) + 2, y_top + 2)
-            self.multi_cell(cw[i] - 3, line_h, h.upper())
-        self.set_y(y_top + row_h)
-
-        # --- Data rows ---
-        for ri, row in enumerate(rows):
-            self.set_font("Helvetica", "", 8)
-            # Measure row height
-            max_lines = 1
-            for i, cell in enumerate(row):
-                nb = self.multi_cell(cw[i] - 4, line_h,
-                                     md_to_fpdf_markdown(cell),
-                                     dry_run=True, output="LINES",
-                                     markdown=True)
-                max_lines = max(max_lines, len(nb))
-            row_h = max_lines * line_h + 3
-
-            y_row = self.get_y()
-            if y_row + row_h > self.h - self.b_margin:
-                self.add_page()
-                y_row = self.get_y()
-
-            # Alternating background
-            if ri % 2 == 1:
-                self.set_fill_color(*TABLE_ALT_BG)
-                self.rect(self.l_margin, y_row, w, row_h, style="F")
-
-            # Bottom border
-            self.set_draw_color(*RULE_GREY)
-            self.set_line_width(0.15)
-            self.line(self.l_margin, y_row + row_h,
-                      self.l_margin + w, y_row + row_h)
-
-            # Cell text
-            for i, cell in enumerate(row):
-                self.set_xy(self.l_margin + sum(cw[:i]) + 2, y_row + 1.5)
-                if i == 0 and n > 1:
-                    self.set_font("Helvetica", "B", 8)
-                else:
-                    self.set_font("Helvetica", "", 8)
-                self.set_text_color(*DARK_TEXT)
-                self.multi_cell(cw[i] - 4, line_h,
-                                md_to_fpdf_markdown(cell), markdown=True)
-
-            self.set_y(y_row + row_h)
+        self.set_font(self.theme.font, *TABLE_HEADER_FONT)
+        self.rect(x0, y_top, sum(layout.widths), layout.header_h, style="F")
+        for lines, x, cw in zip(layout.header, layout.offsets, layout.widths):
+            self._draw_lines(x0 + x + 2, y_top + 2, cw - 3, lines)
+        self.set_y(y_top + layout.header_h)
+        self.set_text_color(*self.theme.text)
+
+    def _table_page_break(self, layout):
+        self.add_page()
+        if self.repeat_table_headers:
+            self._table_header(layout)
+
+    def _table_row(self, layout, cells, start, end, ri):
+        """Draw lines [start, end) of a data row at the current position."""
+        x0 = self.l_margin
+        w = sum(layout.widths)
+        y_row = self.get_y()
+        row_h = (end - start) * TABLE_LINE_H + 3
+
+        # Alternating background
+        if ri % 2 == 1:
+            self.set_fill_color(*self.theme.table_alt)
+            self.rect(x0, y_row, w, row_h, style="F")
+
+        # Bottom border
+        self.set_draw_color(*self.theme.rule)
+        self.set_line_width(0.15)
+        self.line(x0, y_row + row_h, x0 + w, y_row + row_h)
+
+        # Cell text. Wrapped markdown lines spell out their emphasis
+        # (label bold included), so they are drawn from the regular face
+        self.set_font(self.theme.font, *TABLE_CELL_FONT)
+        for lines, x, cw in zip(cells, layout.offsets, layout.widths):
+            self._draw_lines(x0 + x + 2, y_row + 1.5, cw - 4, lines[start:end], markdown=True)
+
+        self.set_y(y_row + row_h)
+
+    def render_table(self, headers, rows, more=False):
+        """
+        Draw a table; cells must already be sanitized (see Table). Rows move
+        to the next page whole, under a repeated header row (unless
+        repeat_table_headers is off); a row taller than a page is split
+        between lines. With `more`, the table goes on in the next Table
+        block. Returns what continue_table returns.
+        """
         self.ln(3)
+        layout = self.layout_table(headers, rows)._replace(more=more)
+        bottom = self.h - self.b_margin
+
+        # Keep the header with at least the start of the first row
+        first_lines = min(self.wrap_row(layout, layout.rows[0])[1], TABLE_MIN_LINES) if layout.rows else 0
+        if self.get_y() + layout.header_h + first_lines * TABLE_LINE_H + 3 > bottom:
+            self.add_page()
+        self._table_header(layout)
+        return self.continue_table(layout, 0)
+
+    def continue_table(self, layout, first):
+        """
+        Draw a measured table's rows from index `first` on. Returns None
+        once they are all drawn. With flush_pages set, a page break that
+        reaches it at a row boundary stops the table there (the new page
+        already carries the repeated header) and (layout, next row index)
+        is returned, so the caller can close the part and continue the
+        table in the next one.
+        """
+        self.table_layout = layout
+        bottom = self.h - self.b_margin
+        for ri in range(first, len(layout.rows)):
+            cells, n_lines = self.wrap_row(layout, layout.rows[ri])
+            start = 0
+            fresh = False  # just broke the page for this row
+            while start < n_lines:
+                fit = int((bottom - self.get_y() - 3) // TABLE_LINE_H)
+                if n_lines - start <= fit:
+                    self._table_row(layout, cells, start, n_lines, layout.start + ri)
+                    break
+                if fresh or fit >= TABLE_MIN_LINES and n_lines > TABLE_SPLIT_LINES:
+                    # Taller than what a page can take: split it here
+                    end = start + max(fit, 1)
+                    self._table_row(layout, cells, start, end, layout.start + ri)
+                    start = end
+                self._table_page_break(layout)
+                if start == 0 and self.flush_pages and self.page_no() >= self.flush_pages:
+                    return layout, ri
+                fresh = True
+        if not layout.more:
+            self.ln(3)
+        return None
 
     def source_text(self, text):
         self.ln(4)
-        self.set_draw_color(*RULE_GREY)
+        self.set_draw_color(*self.theme.rule)
         self.set_line_width(0.3)
         y = self.get_y()
         self.line(self.l_margin, y, self.w - self.r_margin, y)
         self.ln(4)
-        self.set_font("Helvetica", "I", 7)
-        self.set_text_color(*GREY_TEXT)
+        self.set_font(self.theme.font, "I", 7)
+        self.set_text_color(*self.theme.muted)
         self.multi_cell(0, 3.5, sanitize(text))
 
+    # --- Block rendering ---
+
+    def _render_heading(self, block):
+        self.heading(block.text, block.level)
+        if block.level == 1:
+            self.is_first = False
+            if self.header_title is None:
+                self.header_title = sanitize(block.text)
+
+    def _render_paragraph(self, block):
+        if self.is_first:
+            self.set_font(self.theme.font, "", self.theme.body_size)
+            self.set_text_color(*self.theme.muted)
+            self.cell(0, 6, sanitize(block.text.replace("**", "")))
+            self.ln(6)
+            self.is_first = False
+        else:
+            self.body(block.text)
+
+    def _render_rule(self, block):
+        self.hr()
+
+    def _render_table(self, block):
+        if block.continued and self.table_layout is not None:
+            prev = self.table_layout
+            layout = prev._replace(rows=block.rows, start=prev.start + len(prev.rows),
+                                   more=block.more)
+            return self.continue_table(layout, 0)
+        return self.render_table(block.headers, block.rows, block.more)
+
+    def _render_bullets(self, block):
+        for item in block.items:
+            self.bullet(item)
+        self.ln(1.5)
+
+    def _render_numbered(self, block):
+        for idx, item in enumerate(block.items, 1):
+            self.numbered(idx, item)
+        self.ln(1.5)
+
+    def _render_blockquote(self, block):
+        self.blockquote(block.text)
+
+    def _render_code(self, block):
+        self.codeblock(block.text)
+
+    def _render_sources(self, block):
+        self.source_text(block.text)
+
+    BLOCK_RENDERERS = {
+        Heading: _render_heading,
+        Paragraph: _render_paragraph,
+        Rule: _render_rule,
+        Table: _render_table,
+        Bullets: _render_bullets,
+        Numbered: _render_numbered,
+        Blockquote: _render_blockquote,
+        Code: _render_code,
+        Sources: _render_sources,
+    }
+
+    def render_block(self, block):
+        """Draw one block. Returns a cut table's remainder (see continue_table), else None."""
+        return self.BLOCK_RENDERERS[type(block)](self, block)
+
 
 # --- Markdown Parser ---
+#
+# Each line is classified exactly once (precompiled patterns), then a small
+# state machine with one line of lookahead groups lines into blocks. Works on
+# any iterable of lines, so input can be streamed.
+
+HEADING_RE = re.compile(r'^(#{1,4})\s+(.*)')
+TABLE_SEP_RE = re.compile(r'^\|[\s\-|]+\|')
+BULLET_RE = re.compile(r'^[-*]\s+(.*)')
+NUMBERED_RE = re.compile(r'^\d+\.\s+(.*)')
+QUOTE_PREFIX_RE = re.compile(r'^>\s*')
+HEADER_SUFFIX_RE = re.compile(r'\s*h$')
+
+# Line kinds
+BLANK, RULE, HEADING, FENCE, QUOTE, BULLET, NUMBERED, TEXT = range(8)
+
+# Kinds that end a paragraph (as do lines starting with "#" or "|")
+PARAGRAPH_BREAKS = frozenset((BLANK, RULE, HEADING, FENCE, QUOTE, BULLET, NUMBERED))
+
+
+class Line(NamedTuple):
+    raw: str          # line without its trailing newline
+    stripped: str
+    kind: int
+    match: Optional[re.Match]  # heading / list item match, if any
+    is_table_sep: bool
+
+
+def classify(raw):
+    raw = raw.rstrip("\n")
+    stripped = raw.strip()
+    m = None
+    if not stripped:
+        kind = BLANK
+    elif stripped == "---":
+        kind = RULE
+    elif (m := HEADING_RE.match(raw)):
+        kind = HEADING
+    elif stripped.startswith("```"):
+        kind = FENCE
+    elif stripped.startswith(">"):
+        kind = QUOTE
+    elif (m := BULLET_RE.match(stripped)):
+        kind = BULLET
+    elif (m := NUMBERED_RE.match(stripped)):
+        kind = NUMBERED
+    else:
+        kind = TEXT
+    is_sep = stripped.startswith("|") and TABLE_SEP_RE.match(stripped) is not None
+    return Line(raw, stripped, kind, m, is_sep)
+
+
+class LineStream:
+    """Classified lines with one line of lookahead."""
+
+    def __init__(self, lines):
+        self._lines = map(classify, lines)
+        self._next = next(self._lines, None)
+
+    def peek(self):
+        return self._next
 
-def parse_markdown(filepath):
-    with open(filepath, encoding="utf-8") as f:
-        lines = f.readlines()
+    def advance(self):
+        line = self._next
+        self._next = next(self._lines, None)
+        return line
 
-    blocks = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].rstrip("\n")
-        stripped = line.strip()
 
-        if not stripped:
-            i += 1
+def _split_row(stripped):
+    return tuple(sys.intern(sanitize(c.strip())) for c in stripped.strip("|").split("|"))
+
+
+def _list_items(first, stream, kind):
+    """Collect consecutive list items of one kind; single blank lines between items are allowed."""
+    items = [first.match.group(1)]
+    while (line := stream.peek()) is not None:
+        if line.kind == kind:
+            items.append(stream.advance().match.group(1))
+        elif line.kind == BLANK:
+            # Blank lines are skipped by the block loop anyway, so
+            # consuming one before deciding is harmless
+            stream.advance()
+            nxt = stream.peek()
+            if nxt is None or nxt.kind != kind:
+                break
+        else:
+            break
+    return tuple(items)
+
+
+def iter_blocks(lines):
+    """Yield blocks from an iterable of markdown lines."""
+    stream = LineStream(lines)
+    while (line := stream.advance()) is not None:
+        kind = line.kind
+        stripped = line.stripped
+
+        if kind == BLANK:
             continue
 
-        if stripped == "---":
-            blocks.append(("hr",))
-            i += 1
+        if kind == RULE:
+            yield Rule()
             continue
 
-        m = re.match(r'^(#{1,4})\s+(.*)', line)
-        if m:
-            blocks.append(("heading", len(m.group(1)), m.group(2).strip()))
-            i += 1
+        if kind == HEADING:
+            yield Heading(len(line.match.group(1)), line.match.group(2).strip())
             continue
 
-        if stripped.startswith("```"):
+        if kind == FENCE:
             code_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith("```"):
-                code_lines.append(lines[i].rstrip("\n"))
-                i += 1
-            i += 1
-            blocks.append(("code", "\n".join(code_lines)))
+            while (inner := stream.advance()) is not None and inner.kind != FENCE:
+                code_lines.append(inner.raw)
+            yield Code("\n".join(code_lines))
             continue
 
-        if "|" in stripped and i + 1 < len(lines) and \
-                re.match(r'^\|[\s\-|]+\|', lines[i + 1].strip()):
-            headers = [c.strip() for c in stripped.strip("|").split("|")]
-            headers = [re.sub(r'\s*h$', '', h) for h in headers]
-            i += 2
-            rows = []
-            while i < len(lines) and lines[i].strip().startswith("|"):
-                cells = [c.strip() for c in
-                          lines[i].strip().strip("|").split("|")]
-                rows.append(cells)
-                i += 1
-            blocks.append(("table", headers, rows))
+        nxt = stream.peek()
+        if "|" in stripped and nxt is not None and nxt.is_table_sep:
+            headers = tuple(HEADER_SUFFIX_RE.sub('', h) for h in _split_row(stripped))
+            stream.advance()
+            rows, continued = [], False
+            while (row := stream.peek()) is not None and row.stripped.startswith("|"):
+                if len(rows) == TABLE_CHUNK_ROWS:
+                    # Hand a long table over in chunks, so only one is held at a time
+                    yield Table(headers, tuple(rows), continued, more=True)
+                    rows, continued = [], True
+                rows.append(_split_row(stream.advance().stripped))
+            yield Table(headers, tuple(rows), continued)
             continue
 
-        if stripped.startswith(">"):
-            q = []
-            while i < len(lines) and lines[i].strip().startswith(">"):
-                q.append(re.sub(r'^>\s*', '', lines[i].strip()))
-                i += 1
-            blocks.append(("blockquote", " ".join(q)))
+        if kind == QUOTE:
+            q = [QUOTE_PREFIX_RE.sub('', stripped)]
+            while (more := stream.peek()) is not None and more.kind == QUOTE:
+                q.append(QUOTE_PREFIX_RE.sub('', stream.advance().stripped))
+            yield Blockquote(" ".join(q))
             continue
 
-        if re.match(r'^[-*]\s', stripped):
-            items = []
-            while i < len(lines):
-                l = lines[i].strip()
-                if re.match(r'^[-*]\s', l):
-                    items.append(re.sub(r'^[-*]\s+', '', l))
-                elif l and (l.startswith("  ") or l.startswith("\t")):
-                    if items:
-                        items[-1] += " " + l.strip()
-                elif not l:
-                    if i + 1 < len(lines) and re.match(r'^[-*]\s',
-                                                        lines[i+1].strip()):
-                        i += 1
-                        continue
-                    else:
-                        break
-                else:
-                    break
-                i += 1
-            blocks.append(("bullets", items))
+        if kind == BULLET:
+            yield Bullets(_list_items(line, stream, BULLET))
             continue
 
-        if re.match(r'^\d+\.\s', stripped):
-            items = []
-            while i < len(lines):
-                l = lines[i].strip()
-                m2 = re.match(r'^\d+\.\s+(.*)', l)
-                if m2:
-                    items.append(m2.group(1))
-                elif l and (l.startswith("  ") or l.startswith("\t")):
-                    if items:
-                        items[-1] += " " + l.strip()
-                elif not l:
-                    if i+1 < len(lines) and re.match(r'^\d+\.\s',
-                                                      lines[i+1].strip()):
-                        i += 1
-                        continue
-                    else:
-                        break
-                else:
-                    break
-                i += 1
-            blocks.append(("numbered", items))
+        if kind == NUMBERED:
+            yield Numbered(_list_items(line, stream, NUMBERED))
             continue
 
-        para = []
-        while i < len(lines):
-            l = lines[i].strip()
-            if (not l or l == "---" or l.startswith("#") or
-                    l.startswith("|") or l.startswith(">") or
-                    l.startswith("```") or re.match(r'^[-*]\s', l) or
-                    re.match(r'^\d+\.\s', l)):
-                break
-            para.append(l)
-            i += 1
+        # Paragraph: always takes its first line, then runs to the next break
+        para = [stripped]
+        while (more := stream.peek()) is not None and not (
+                more.kind in PARAGRAPH_BREAKS or
+                more.stripped.startswith(("#", "|"))):
+            para.append(stream.advance().stripped)
         text = " ".join(para)
         if text.startswith("*Sources:") or text.startswith("*Sources"):
-            blocks.append(("sources", text.strip("*")))
+            yield Sources(text.strip("*"))
         else:
-            blocks.append(("paragraph", text))
+            yield Paragraph(text)
 
-    return blocks
+
+def split_frontmatter(lines):
+    """
+    Split a leading YAML frontmatter block (between "---" lines) off an
+    iterable of markdown lines. Returns (meta, rest), where rest iterates
+    over the remaining lines, so a file is still streamed.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip("\r\n") != "---":
+        return {}, chain([first], lines)
+    block = []
+    for line in lines:
+        if line.rstrip("\r\n") == "---":
+            break
+        block.append(line)
+    else:
+        # Never closed: not frontmatter after all
+        return {}, chain([first], block)
+    meta = {}
+    if yaml is not None:
+        try:
+            meta = yaml.safe_load("".join(line.rstrip("\r\n") + "\n" for line in block)) or {}
+        except yaml.YAMLError:
+            meta = {}
+    return (meta if isinstance(meta, dict) else {}), lines
+
+
+def parse_markdown(source):
+    """Parse a markdown file path, or any iterable of lines, into blocks."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            return list(iter_blocks(f))
+    return list(iter_blocks(source))
 
 
 # --- Build PDF ---
 
-def build_pdf(blocks, output_path):
-    pdf = ReportPDF(orientation="P", unit="mm", format="Letter")
+def new_pdf(repeat_headers=True, theme=DEFAULT_THEME, title=None):
+    pdf = ReportPDF(orientation="P", unit="mm", format="Letter",
+                    theme=theme, header_title=title)
     pdf.set_auto_page_break(auto=True, margin=18)
-    pdf.set_margins(left=22, top=18, right=22)
-    pdf.add_page()
+    pdf.set_margins(left=theme.margin, top=18, right=theme.margin)
+    pdf.repeat_table_headers = repeat_headers
+    if title:
+        pdf.set_title(title)
+    return pdf
 
-    is_first = True
 
-    for block in blocks:
-        kind = block[0]
+def build_pdf(blocks, output_path, flush_pages=None, repeat_headers=True,
+              theme=DEFAULT_THEME, title=None):
+    """
+    Render blocks to output_path and return the page count. The running
+    header shows `title`, or the first H1 when no title is given.
 
-        if kind == "heading":
-            lvl, text = block[1], block[2]
-            if is_first and lvl == 1:
-                pdf.heading(text, 1)
-                is_first = False
-            else:
-                pdf.heading(text, lvl)
-
-        elif kind == "paragraph":
-            text = block[1]
-            if is_first:
-                clean = text.replace("**", "")
-                pdf.set_font("Helvetica", "", 9.5)
-                pdf.set_text_color(*GREY_TEXT)
-                pdf.cell(0, 6, sanitize(clean))
-                pdf.ln(6)
-                is_first = False
+    With flush_pages, the document is built in parts of about that many
+    pages. Each part is written to a temporary file as soon as it fills,
+    and the parts are stitched together at the end, so memory stays bounded
+    however long the report is. Parts end between blocks, or inside a long
+    table at a page break between rows; either way the next part carries on
+    from the same spot on the same page (a table under the header row its
+    previous part already drew there).
+    """
+    if not flush_pages:
+        pdf = new_pdf(repeat_headers, theme, title)
+        pdf.add_page()
+        for block in blocks:
+            pdf.render_block(block)
+        pdf.output(output_path)
+        print(f"PDF written to {output_path}")
+        return pdf.page_no()
+
+    if PdfReader is None:
+        raise RuntimeError("building in parts needs pypdf (pip install pypdf)")
+
+    with tempfile.TemporaryDirectory(prefix="report-parts-") as tmp:
+        parts = []
+        pdf = None
+        offset, resume_y, is_first, table_layout = 0, None, True, None
+
+        def start_part():
+            part = new_pdf(repeat_headers, theme, title)
+            part.page_offset = offset
+            part.resumed = resume_y is not None
+            part.is_first = is_first
+            part.table_layout = table_layout
+            part.flush_pages = flush_pages
+            part.add_page()
+            if resume_y is not None:
+                part.set_y(resume_y)
+            return part
+
+        def close_part(part):
+            nonlocal offset, resume_y, is_first, title, table_layout
+            # Read the position first: closing the part moves to the footer
+            resume_y, is_first = part.get_y(), part.is_first
+            table_layout = part.table_layout
+            title = part.header_title
+            offset += part.page_no() - 1
+            parts.append(os.path.join(tmp, f"part-{len(parts):04d}.pdf"))
+            part.output(parts[-1])
+
+        for block in blocks:
+            if pdf is None:
+                pdf = start_part()
+            rest = pdf.render_block(block)
+            while rest is not None:
+                # A table filled the part: carry its remaining rows over
+                close_part(pdf)
+                pdf = start_part()
+                rest = pdf.continue_table(*rest)
+            if pdf.page_no() >= flush_pages:
+                close_part(pdf)
+                pdf = None
+        if pdf is not None or not parts:
+            if pdf is None:
+                pdf = new_pdf(repeat_headers, theme, title)
+                pdf.add_page()
+            parts.append(os.path.join(tmp, f"part-{len(parts):04d}.pdf"))
+            pdf.output(parts[-1])
+        pages = merge_parts(parts, output_path)
+
+    print(f"PDF written to {output_path} ({len(parts)} parts)")
+    return pages
+
+
+class StreamingPdfWriter:
+    """
+    Write pages copied from other PDFs straight to a file. Each object is
+    written as soon as it is copied, so memory holds object offsets and page
+    numbers, not the document. Objects are renumbered per source reader;
+    forget() a reader once all its pages are written.
+    """
+
+    PAGES, CATALOG = 1, 2  # written last, once the page list is known
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = [None, None, None]  # by object number; 0 is the free-list head
+        self.page_numbers = []
+        self.info = None
+        # id(source reader) -> {source object number: output object number}
+        self._numbers = {}
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _reserve(self):
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def _write(self, number, obj):
+        self.offsets[number] = self.f.tell()
+        self.f.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(self.f)
+        self.f.write(b"\nendobj\n")
+
+    def _number(self, ref, pending):
+        """Output number for an indirect reference, queueing its object on first sight."""
+        numbers = self._numbers.setdefault(id(ref.pdf), {})
+        number = numbers.get(ref.idnum)
+        if number is None:
+            number = numbers[ref.idnum] = self._reserve()
+            pending.append((number, ref.get_object()))
+        return number
+
+    def _copy(self, obj, pending, skip=()):
+        """obj with its references renumbered; direct streams become indirect objects."""
+        if isinstance(obj, IndirectObject):
+            return IndirectObject(self._number(obj, pending), 0, None)
+        if isinstance(obj, StreamObject):
+            number = self._reserve()
+            pending.append((number, obj))
+            return IndirectObject(number, 0, None)
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({k: self._copy(v, pending) for k, v in obj.items() if k not in skip})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._copy(v, pending) for v in obj)
+        return obj
+
+    def _copy_stream(self, obj, pending):
+        if isinstance(obj, EncodedStreamObject):
+            stream = EncodedStreamObject()
+            stream._data = obj._data  # raw bytes, still encoded: written as-is
+            skip = ("/Length",)
+        else:
+            # Decoded (e.g. a content stream rebuilt by merge_page): write it plain
+            stream = DecodedStreamObject()
+            stream.set_data(obj.get_data())
+            skip = ("/Length", "/Filter", "/DecodeParms")
+        for key, value in obj.items():
+            if key not in skip:
+                stream[key] = self._copy(value, pending)
+        return stream
+
+    def _copy_page(self, page, pending):
+        """A page hung off this file's page tree, with its inherited media box made explicit."""
+        copy = self._copy(page, pending, skip=("/Parent",))
+        copy[NameObject("/Parent")] = IndirectObject(self.PAGES, 0, None)
+        if hasattr(page, "mediabox"):
+            copy[NameObject("/MediaBox")] = self._copy(page.mediabox, pending)
+        return copy
+
+    def _flush(self, pending):
+        while pending:
+            number, obj = pending.pop()
+            if isinstance(obj, StreamObject):
+                self._write(number, self._copy_stream(obj, pending))
+            elif isinstance(obj, DictionaryObject) and obj.get("/Type") == "/Page":
+                # Reached through a reference: never follow /Parent into the source's page tree
+                self._write(number, self._copy_page(obj, pending))
             else:
-                pdf.body(text)
+                self._write(number, self._copy(obj, pending))
 
-        elif kind == "hr":
-            pdf.hr()
+    def add_page(self, page):
+        """Write a page (a pypdf PageObject) and everything it references."""
+        pending = []
+        if page.indirect_reference is not None:
+            number = self._number(page.indirect_reference, [])
+        else:
+            number = self._reserve()
+        self._write(number, self._copy_page(page, pending))
+        self._flush(pending)
+        self.page_numbers.append(number)
 
-        elif kind == "table":
-            pdf.render_table(block[1], block[2])
+    def set_info(self, info):
+        """Document information dictionary (title, producer, ...), copied like a page."""
+        pending = []
+        self.info = self._copy(info, pending)
+        self._flush(pending)
 
-        elif kind == "bullets":
-            for item in block[1]:
-                pdf.bullet(item)
-            pdf.ln(1.5)
+    def forget(self, reader):
+        self._numbers.pop(id(reader), None)
 
-        elif kind == "numbered":
-            for idx, item in enumerate(block[1], 1):
-                pdf.numbered(idx, item)
-            pdf.ln(1.5)
+    def close(self):
+        """Write the page tree, catalog, cross-reference table and trailer."""
+        self._write(self.PAGES, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(n, 0, None) for n in self.page_numbers),
+            NameObject("/Count"): NumberObject(len(self.page_numbers)),
+        }))
+        self._write(self.CATALOG, DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(self.PAGES, 0, None),
+        }))
+        xref = self.f.tell()
+        self.f.write(f"xref\n0 {len(self.offsets)}\n0000000000 65535 f \n".encode())
+        for offset in self.offsets[1:]:
+            self.f.write(f"{offset:010d} 00000 n \n".encode())
+        trailer = DictionaryObject({
+            NameObject("/Size"): NumberObject(len(self.offsets)),
+            NameObject("/Root"): IndirectObject(self.CATALOG, 0, None),
+        })
+        if self.info is not None:
+            trailer[NameObject("/Info")] = self.info
+        self.f.write(b"trailer\n")
+        trailer.write_to_stream(self.f)
+        self.f.write(f"\nstartxref\n{xref}\n%%EOF\n".encode())
 
-        elif kind == "blockquote":
-            pdf.blockquote(block[1])
 
-        elif kind == "code":
-            pdf.codeblock(block[1])
+def merge_parts(parts, output_path):
+    """
+    Join part PDFs; each part's first page is overlaid on the previous part's
+    last. Pages are streamed to output_path as they are joined and each part
+    is closed once copied, so only one part is in memory at a time.
+    """
+    with open(output_path, "wb") as out:
+        writer = StreamingPdfWriter(out)
+        held = None   # last page so far; the next part's first page is drawn onto it
+        sources = []  # (file, reader) pairs the held page still draws from
+        for n, part in enumerate(parts):
+            f = open(part, "rb")
+            reader = PdfReader(f)
+            pages = list(reader.pages)
+            if n == 0 and "/Info" in reader.trailer:
+                writer.set_info(reader.trailer["/Info"])
+            if held is not None:
+                held.merge_page(pages[0])
+                pages[0] = held
+            for page in pages[:-1]:
+                writer.add_page(page)
+                # Once the held page is written the previous parts are done
+                for done_f, done_reader in sources:
+                    writer.forget(done_reader)
+                    done_f.close()
+                sources = []
+            sources.append((f, reader))
+            held = pages[-1]
+        writer.add_page(held)
+        for done_f, _ in sources:
+            done_f.close()
+        writer.close()
+    return len(writer.page_numbers)
 
-        elif kind == "sources":
-            pdf.source_text(block[1])
 
-    pdf.output(output_path)
-    print(f"PDF written to {output_path}")
+def render_markdown(md_path, pdf_path, title=None, theme=DEFAULT_THEME,
+                    flush_pages=None, repeat_headers=True):
+    """
+    Render one markdown file to PDF, streaming its blocks. YAML frontmatter
+    is left out of the PDF; its title is used when none is given. Returns
+    the page count.
+    """
+    with open(md_path, encoding="utf-8") as f:
+        meta, lines = split_frontmatter(f)
+        return build_pdf(iter_blocks(lines), str(pdf_path), flush_pages=flush_pages,
+                         repeat_headers=repeat_headers, theme=theme,
+                         title=title or meta.get("title"))
+
+
+def _render_for_pool(md_path, pdf_path, options):
+    """Process-pool entry point: render one file, never raise."""
+    started = time.perf_counter()
+    try:
+        pages = render_markdown(md_path, pdf_path, **options)
+    except Exception as e:
+        return {"input": md_path, "output": pdf_path, "error": f"{type(e).__name__}: {e}"}
+    return {"input": md_path, "output": pdf_path, "pages": pages,
+            "seconds": round(time.perf_counter() - started, 2)}
+
+
+def render_many(jobs, workers=None, **options):
+    """
+    Render (md_path, pdf_path) pairs across a process pool. Yields one
+    result dict per file as it finishes: input, output, pages and seconds,
+    or error.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_for_pool, str(md), str(pdf), options) for md, pdf in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def output_paths(inputs, output=None):
+    """
+    Where each input's PDF goes: next to the input by default; `output` is
+    the PDF path for a single input, otherwise a directory.
+    """
+    if output is None:
+        return [p.with_suffix(".pdf") for p in inputs]
+    output = Path(output)
+    if len(inputs) == 1 and output.suffix.lower() == ".pdf":
+        output.parent.mkdir(parents=True, exist_ok=True)
+        return [output]
+    output.mkdir(parents=True, exist_ok=True)
+    return [output / f"{p.stem}.pdf" for p in inputs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render markdown reports to PDF with fpdf2")
+    parser.add_argument("inputs", nargs="+", help="Markdown files")
+    parser.add_argument("-o", "--output", help="Output PDF (one input) or directory (default: next to each input)")
+    parser.add_argument("--title", help="Running header title (default: the frontmatter title, else the report's first H1)")
+    parser.add_argument("--preset", help="Take the theme from presets/<name>.yaml (design: fpdf:)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes for many inputs (default: CPU count)")
+    parser.add_argument("--flush-pages", type=int, help="Build in parts of N pages to bound memory on very long reports")
+    parser.add_argument("--no-repeat-headers", action="store_true", help="Don't repeat table header rows after page breaks")
+    args = parser.parse_args()
+
+    inputs = [Path(p) for p in args.inputs]
+    missing = [str(p) for p in inputs if not p.is_file()]
+    if missing:
+        print(f"Error: input not found: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        theme = load_theme(args.preset) if args.preset else DEFAULT_THEME
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    options = {
+        "title": args.title,
+        "theme": theme,
+        "flush_pages": args.flush_pages,
+        "repeat_headers": not args.no_repeat_headers,
+    }
+    outputs = output_paths(inputs, args.output)
+
+    if len(inputs) == 1:
+        render_markdown(inputs[0], outputs[0], **options)
+        return
+
+    started = time.perf_counter()
+    failed = 0
+    for result in render_many(zip(inputs, outputs), workers=args.jobs, **options):
+        if "error" in result:
+            failed += 1
+            print(f"  ERROR {result['input']}: {result['error']}", file=sys.stderr)
+        else:
+            print(f"  {result['output']} ({result['pages']} pages, {result['seconds']}s)", file=sys.stderr)
+    print(
+        f"\nRendered {len(inputs) - failed}/{len(inputs)} files in "
+        f"{time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    blocks = parse_markdown(MD_PATH)
-    build_pdf(blocks, PDF_PATH)
+    main()
@@ -1,17 +0,0 @@
-const { chromium } = require('playwright');
-
-(async () => {
-    const browser = await chromium.launch();
-    const page = await browser.newPage();
-    await page.goto('http://127.0.0.1:8765/output/report.html', { waitUntil: 'networkidle', timeout: 30000 });
-    await page.waitForTimeout(3000);
-    await page.pdf({
-        path: 'output/report.pdf',
-        format: 'Letter',
-        printBackground: true,
-        preferCSSPageSize: true,
-        margin: { top: '0', right: '0', bottom: '0', left: '0' }
-    });
-    await browser.close();
-    console.log('PDF generated successfully');
-})();
@@ -0,0 +1,203 @@
+"""
+Asset Server
+
+Local HTTP server that Chromium loads reports from (Playwright needs
+http://, not file://). One threaded server is shared by every render in
+the process, batch renders included, so a page's parallel requests for
+stylesheets, fonts and images are served concurrently and the socket is
+opened once.
+
+Only files under SERVED_DIRS are reachable; everything else in the
+project (sources, presets, .git, ...) answers 404. URLs mirror the
+project layout, so /output/report.html is PROJECT_ROOT/output/report.html.
+
+Small files are kept in an in-memory LRU (revalidated against mtime and
+size on every request). Responses carry an ETag, and conditional requests
+get 304s. Content-addressed files from the asset pipeline (.cache/assets/)
+are marked immutable; everything else must be revalidated, so edits show
+up on the next render while unchanged files cost a 304.
+
+Usage:
+    server = AssetServer()
+    url = server.url_for(Path("output/report.html"))
+    ...
+    server.close()
+"""
+
+import hashlib
+import mimetypes
+import threading
+import urllib.parse
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Directories (relative to the project root) the server will read from
+SERVED_DIRS = ("output", "styles", "assets", ".cache/assets")
+
+# Content-addressed: a file's name changes whenever its bytes do
+IMMUTABLE_DIRS = (".cache/assets",)
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Larger files are streamed from disk on every request
+MAX_CACHED_FILE = 8 * 1024 * 1024
+CHUNK_BYTES = 256 * 1024
+
+mimetypes.add_type("font/woff2", ".woff2")
+mimetypes.add_type("font/woff", ".woff")
+mimetypes.add_type("font/ttf", ".ttf")
+mimetypes.add_type("font/otf", ".otf")
+
+
+class CachedFile:
+    __slots__ = ("mtime_ns", "size", "body", "etag")
+
+    def __init__(self, mtime_ns: int, size: int, body: bytes | None, etag: str):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.body = body
+        self.etag = etag
+
+
+class AssetServer:
+    """Threaded, caching HTTP server over the project's served directories."""
+
+    def __init__(
+        self,
+        root: Path = PROJECT_ROOT,
+        served_dirs: tuple[str, ...] = SERVED_DIRS,
+        max_cache_bytes: int = MAX_CACHE_BYTES,
+    ):
+        self.root = root.resolve()
+        self.served = [(self.root / d).resolve() for d in served_dirs]
+        self.immutable = [(self.root / d).resolve() for d in IMMUTABLE_DIRS]
+        self.max_cache_bytes = max_cache_bytes
+        self._files: OrderedDict[Path, CachedFile] = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(AssetRequestHandler):
+            assets = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def is_served(self, path: Path) -> bool:
+        path = path.resolve()
+        return any(path.is_relative_to(d) for d in self.served)
+
+    def url_for(self, path: Path) -> str | None:
+        """http:// URL for a file the server exposes, or None if it is outside SERVED_DIRS."""
+        path = path.resolve()
+        if not self.is_served(path):
+            return None
+        return f"http://127.0.0.1:{self.port}/{urllib.parse.quote(path.relative_to(self.root).as_posix())}"
+
+    def resolve(self, url_path: str) -> Path | None:
+        """The served file behind a request path, or None (missing, directory or not served)."""
+        rel = urllib.parse.unquote(urllib.parse.urlsplit(url_path).path).lstrip("/")
+        path = (self.root / rel).resolve()
+        if not self.is_served(path) or not path.is_file():
+            return None
+        return path
+
+    def cache_control(self, path: Path) -> str:
+        if any(path.is_relative_to(d) for d in self.immutable):
+            return "public, max-age=31536000, immutable"
+        return "no-cache"
+
+    def lookup(self, path: Path) -> CachedFile:
+        """
+        Current version of `path`: from memory if unchanged on disk, else
+        re-read (small files) or re-stat'ed (large files, body None).
+        """
+        stat = path.stat()
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._files.move_to_end(path)
+                return entry
+
+        if stat.st_size > MAX_CACHED_FILE:
+            return CachedFile(stat.st_mtime_ns, stat.st_size, None, f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"')
+
+        body = path.read_bytes()
+        entry = CachedFile(stat.st_mtime_ns, len(body), body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        with self._lock:
+            previous = self._files.pop(path, None)
+            if previous is not None:
+                self._cached_bytes -= previous.size
+            self._files[path] = entry
+            self._cached_bytes += entry.size
+            while self._cached_bytes > self.max_cache_bytes and self._files:
+                _, evicted = self._files.popitem(last=False)
+                self._cached_bytes -= evicted.size
+        return entry
+
+
+class AssetRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD for an AssetServer; bound to one via the `assets` class attribute."""
+
+    assets: AssetServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        path = self.assets.resolve(self.path)
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        try:
+            entry = self.assets.lookup(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        etags = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if entry.etag in etags or "*" in etags:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", entry.etag)
+            self.send_header("Cache-Control", self.assets.cache_control(path))
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(entry.size))
+        self.send_header("ETag", entry.etag)
+        self.send_header("Cache-Control", self.assets.cache_control(path))
+        self.end_headers()
+        if not send_body:
+            return
+        if entry.body is not None:
+            self.wfile.write(entry.body)
+            return
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_BYTES):
+                self.wfile.write(chunk)
+
+    def log_message(self, format, *args):
+        pass  # suppress logs
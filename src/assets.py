@@ -0,0 +1,545 @@
+"""
+Asset Pipeline
+
+Pre-render stage that makes a report self-contained and print-sized before
+Chromium sees it:
+
+- Google Fonts links, and Google Fonts stylesheets pulled in by CSS
+  @import, are replaced by local @font-face rules. The font files are
+  downloaded once (then served from the cache, so renders work offline)
+  and subset to the characters the report uses; only the weights and
+  styles the report's CSS and markup ask for are kept.
+- Fonts referenced from local stylesheets (and the stylesheets they
+  @import) are subset the same way.
+- Raster images (<img> and CSS url()) are downscaled to PRINT_DPI at their
+  displayed size (capped at the page's content width) and recompressed.
+
+Processed files live in .cache/assets/, keyed by a hash of their source
+content and processing settings, so unchanged assets are processed once.
+A stylesheet is copied there only when something it references was
+processed; its other relative references are re-pointed at the originals.
+The rewritten page is written next to the original as <name>.print.html;
+the original HTML is left untouched for review and QA.
+
+Fonts need fontTools and images need Pillow; without them that step is
+skipped and the original files are used.
+
+Usage:
+    python src/assets.py output/report.html     # writes output/report.print.html
+
+    from assets import AssetPipeline
+    summary = AssetPipeline().process(Path("output/report.html"))
+"""
+
+import argparse
+import hashlib
+import html
+import io
+import os
+import re
+import sys
+import time
+import urllib.request
+from collections.abc import Iterator
+from pathlib import Path
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+try:
+    import brotli  # noqa: F401 -- fontTools needs it for WOFF2
+    FONT_FLAVOR = "woff2"
+except ImportError:
+    FONT_FLAVOR = "woff"
+
+from render_cache import REMOTE_PREFIXES, FileDigests, atomic_write, resolve_local_ref
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "assets"
+
+# Bump to invalidate every processed asset when the processing changes
+ASSET_VERSION = "1"
+
+# Target resolution for raster images, and the widest an image can print:
+# US Letter (8.5in) less the 1in side margins in styles/print.css
+PRINT_DPI = 300
+CONTENT_WIDTH_IN = 6.5
+CSS_PX_PER_IN = 96
+JPEG_QUALITY = 85
+
+FETCH_TIMEOUT = 15
+GOOGLE_FONTS_HOSTS = ("fonts.googleapis.com", "fonts.gstatic.com")
+
+# Kept in every font subset whatever the text says: ASCII (page counters,
+# running headers and CSS-generated content) and common typographic marks
+BASE_CHARS = "".join(map(chr, range(0x20, 0x7F))) + "\u00a0\u2013\u2014\u2018\u2019\u201c\u201d\u2022\u2026"
+
+FONT_SUFFIXES = {".ttf", ".otf", ".woff", ".woff2"}
+IMAGE_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+IMG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+ATTR_RE = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+?)\1\s*\)""", re.IGNORECASE)
+# String-form @import; the url() form is matched by CSS_URL_RE
+CSS_IMPORT_RE = re.compile(r"""(@import\s+)(["'])([^"']+)\2""", re.IGNORECASE)
+# A whole @import rule in either form, media queries included
+CSS_IMPORT_RULE_RE = re.compile(
+    r"""@import\s+(?:url\(\s*(["']?)([^"')]+?)\1\s*\)|(["'])([^"']+)\3)[^;]*;?""", re.IGNORECASE
+)
+# A rewritten font url() and the format() hint after it, which must name the new flavour
+FONT_FORMAT_RE = re.compile(r"""(url\("[^"]+\.(woff2?)"\)\s*)format\(\s*["']?[\w-]+["']?\s*\)""", re.IGNORECASE)
+# Font weights and styles a page asks for: CSS declarations (longhand and
+# the font shorthand), and the elements browsers draw bold or italic
+FONT_WEIGHT_RE = re.compile(r"(?<![\w-])font-weight\s*:\s*([\w-]+)", re.IGNORECASE)
+FONT_STYLE_RE = re.compile(r"(?<![\w-])font-style\s*:\s*([\w-]+)", re.IGNORECASE)
+FONT_SHORTHAND_RE = re.compile(r"""(?<![\w-])font\s*:\s*([^;}"']+)""", re.IGNORECASE)
+BOLD_TAG_RE = re.compile(r"<(?:b|strong|h[1-6]|th)\b", re.IGNORECASE)
+ITALIC_TAG_RE = re.compile(r"<(?:i|em|cite|var|dfn|address)\b", re.IGNORECASE)
+WEIGHT_KEYWORDS = {"normal": 400, "bold": 700, "bolder": 700, "lighter": 100}
+FONT_STYLES = ("normal", "italic", "oblique")
+# An @font-face rule with the comment Google Fonts puts before it (e.g. /* latin */)
+FONT_FACE_RE = re.compile(r"(?:/\*[^*]*\*/\s*)?@font-face\s*\{([^}]*)\}\s*", re.IGNORECASE)
+FONT_DESCRIPTOR_RE = re.compile(r"(font-family|font-style|font-weight)\s*:\s*([^;]+)", re.IGNORECASE)
+SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def tag_attrs(tag: str) -> dict[str, str]:
+    """Attributes of one HTML start tag, names lowercased."""
+    return {m.group(1).lower(): next(v for v in m.groups()[1:] if v is not None) for m in ATTR_RE.finditer(tag)}
+
+
+def replace_attr(tag: str, name: str, value: str) -> str:
+    """Set attribute `name` of a start tag that already has it."""
+    def swap(m: re.Match) -> str:
+        return f'{m.group(1)}="{value}"' if m.group(1).lower() == name else m.group(0)
+    return ATTR_RE.sub(swap, tag)
+
+
+def visible_text(page: str) -> str:
+    """A page's text content: markup, scripts and styles dropped, entities decoded."""
+    return html.unescape(TAG_RE.sub(" ", SCRIPT_STYLE_RE.sub(" ", page)))
+
+
+def used_chars(page: str) -> str:
+    """Every character a font may have to draw for this page, in both cases."""
+    chars = set(visible_text(page)) | set(BASE_CHARS)
+    chars |= {c.upper() for c in chars} | {c.lower() for c in chars}
+    return "".join(sorted(c for c in chars if len(c) == 1 and c >= " "))
+
+
+def stylesheet_texts(refs: list[str], base_dir: Path, seen: set[Path]) -> Iterator[str]:
+    """Text of the local stylesheets `refs` name, each followed by those it @imports."""
+    for ref in refs:
+        path = resolve_local_ref(ref, base_dir)
+        if path is None or path in seen or path.suffix.lower() != ".css":
+            continue
+        seen.add(path)
+        css = path.read_text(encoding="utf-8", errors="replace")
+        yield css
+        imports = [m.group(2) or m.group(4) for m in CSS_IMPORT_RULE_RE.finditer(css)]
+        yield from stylesheet_texts(imports, path.parent, seen)
+
+
+def page_css(page: str, base_dir: Path) -> str:
+    """A page followed by every local stylesheet it links or @imports, so all its CSS can be scanned."""
+    refs = [attrs.get("href", "") for attrs in map(tag_attrs, LINK_RE.findall(page))
+            if "stylesheet" in attrs.get("rel", "").lower().split()]
+    refs += [m.group(2) or m.group(4) for m in CSS_IMPORT_RULE_RE.finditer(page)]
+    return "\n".join([page, *stylesheet_texts(refs, base_dir, set())])
+
+
+def parse_weight(value: str) -> int | None:
+    value = value.lower()
+    if value in WEIGHT_KEYWORDS:
+        return WEIGHT_KEYWORDS[value]
+    return int(value) if value.isdigit() and 1 <= int(value) <= 1000 else None
+
+
+def used_faces(text: str) -> set[tuple[int, str]]:
+    """
+    (weight, style) pairs the page may draw text in, from page_css() text.
+    Weights and styles are set independently, so every combination counts.
+    """
+    weights, styles = {400}, {"normal"}
+    values = FONT_WEIGHT_RE.findall(text) + FONT_STYLE_RE.findall(text)
+    for shorthand in FONT_SHORTHAND_RE.findall(text):
+        values += shorthand.split()
+    for value in values:
+        if value.lower() in FONT_STYLES:
+            styles.add(value.lower())
+        elif (weight := parse_weight(value)) is not None:
+            weights.add(weight)
+    if BOLD_TAG_RE.search(text):
+        weights.add(700)
+    if ITALIC_TAG_RE.search(text):
+        styles.add("italic")
+    return {(weight, style) for weight in weights for style in styles}
+
+
+def weight_preference(wanted: int, lo: int, hi: int) -> tuple[int, int]:
+    """Sort key for a face covering weights lo..hi when `wanted` is asked for (CSS font matching)."""
+    if lo <= wanted <= hi:
+        return (0, 0)
+    nearest = lo if lo > wanted else hi
+    heavier = nearest > wanted
+    if 400 <= wanted <= 500:
+        # Up to 500 first, then lighter, then heavier
+        tier = 1 if heavier and nearest <= 500 else 2 if not heavier else 3
+    elif wanted < 400:
+        tier = 2 if heavier else 1
+    else:
+        tier = 1 if heavier else 2
+    return (tier, abs(nearest - wanted))
+
+
+# Styles to fall back on, in order, when a family lacks the one asked for
+STYLE_FALLBACK = {
+    "normal": ("normal", "oblique", "italic"),
+    "italic": ("italic", "oblique", "normal"),
+    "oblique": ("oblique", "italic", "normal"),
+}
+
+
+def select_font_faces(css: str, faces: set[tuple[int, str]]) -> str:
+    """
+    Drop the @font-face rules that the browser would pick for none of
+    `faces`. Every rule of a picked face is kept (Google Fonts splits a
+    face into several unicode-range rules), as is any rule whose weight or
+    style cannot be read.
+    """
+    families: dict[str, list[tuple[int, str, int, int]]] = {}
+    keep = set()
+    for m in FONT_FACE_RE.finditer(css):
+        descriptors = {k.lower(): v.strip() for k, v in FONT_DESCRIPTOR_RE.findall(m.group(1))}
+        style = descriptors.get("font-style", "normal").split()[0].lower()
+        weights = [parse_weight(w) for w in descriptors.get("font-weight", "normal").split()]
+        if style not in FONT_STYLES or not weights or None in weights:
+            keep.add(m.start())
+            continue
+        family = descriptors.get("font-family", "").strip("'\"").lower()
+        families.setdefault(family, []).append((m.start(), style, min(weights), max(weights)))
+
+    for rules in families.values():
+        for weight, style in faces:
+            available = {rule[1] for rule in rules}
+            best_style = next(s for s in STYLE_FALLBACK[style] if s in available)
+            candidates = [rule for rule in rules if rule[1] == best_style]
+            best = min(candidates, key=lambda rule: weight_preference(weight, rule[2], rule[3]))
+            keep.update(rule[0] for rule in candidates if rule[2:] == best[2:])
+
+    return FONT_FACE_RE.sub(lambda m: m.group(0) if m.start() in keep else "", css)
+
+
+def relative_ref(target: Path, base_dir: Path) -> str:
+    return Path(os.path.relpath(target, base_dir)).as_posix()
+
+
+def rebase_css(css: str, from_dir: Path, to_dir: Path) -> str:
+    """Re-point the relative url() and @import references of CSS moved from from_dir to to_dir."""
+    def rebase(ref: str) -> str:
+        if ref.startswith("/") or ref.lower().startswith(REMOTE_PREFIXES):
+            return ref
+        return relative_ref(from_dir / ref, to_dir)
+
+    css = CSS_URL_RE.sub(lambda m: f'url("{rebase(m.group(2).strip())}")', css)
+    return CSS_IMPORT_RE.sub(lambda m: f'{m.group(1)}"{rebase(m.group(3).strip())}"', css)
+
+
+class AssetPipeline:
+    """Content-addressed cache of subset fonts and print-sized images."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, dpi: int = PRINT_DPI):
+        self.cache_dir = cache_dir.resolve()
+        self.dpi = dpi
+        # Batch runs hash shared assets once
+        self._digest = FileDigests()
+
+    def _key(self, *parts: str) -> str:
+        return hashlib.sha256("\n".join((f"v{ASSET_VERSION}", *parts)).encode()).hexdigest()
+
+    def _store(self, kind: str, key: str, suffix: str, produce) -> Path:
+        """Cached entry for `key`, calling produce() for its bytes on a miss."""
+        entry = self.cache_dir / kind / f"{key}{suffix}"
+        if entry.exists():
+            return entry
+        data = produce()
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(entry) as tmp:
+            tmp.write_bytes(data)
+        return entry
+
+    def fetch(self, url: str) -> bytes:
+        """Download `url` once; later calls (and offline runs) read the cached copy."""
+        def download() -> bytes:
+            # The default urllib User-Agent gets TrueType from Google Fonts,
+            # which fontTools can subset without extra codecs
+            with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT) as response:
+                return response.read()
+        return self._store("remote", self._key("url", url), "", download).read_bytes()
+
+    def subset_font(self, data: bytes, chars: str, summary: dict) -> Path:
+        """Subset font bytes to `chars`; returns the cached font file."""
+        def produce() -> bytes:
+            options = font_subset.Options()
+            options.flavor = FONT_FLAVOR
+            options.layout_features = ["*"]
+            options.notdef_outline = True
+            font = font_subset.load_font(io.BytesIO(data), options)
+            subsetter = font_subset.Subsetter(options)
+            subsetter.populate(text=chars)
+            subsetter.subset(font)
+            out = io.BytesIO()
+            font_subset.save_font(font, out, options)
+            return out.getvalue()
+
+        key = self._key("font", hashlib.sha256(data).hexdigest(), chars, FONT_FLAVOR)
+        entry = self._store("fonts", key, f".{FONT_FLAVOR}", produce)
+        summary["fonts"] += 1
+        summary["bytes_in"] += len(data)
+        summary["bytes_out"] += entry.stat().st_size
+        return entry
+
+    def print_image(self, path: Path, max_px: int, summary: dict) -> Path:
+        """Downscale (never upscale) and recompress an image; returns the cached file."""
+        image_format = IMAGE_FORMATS[path.suffix.lower()]
+
+        def produce() -> bytes:
+            original = path.read_bytes()
+            with Image.open(io.BytesIO(original)) as image:
+                image = ImageOps.exif_transpose(image)
+                resized = image.width > max_px
+                if resized:
+                    if image.mode in ("1", "P"):
+                        image = image.convert("RGBA")  # palette images only resample as nearest-neighbour
+                    height = max(1, round(image.height * max_px / image.width))
+                    image = image.resize((max_px, height), Image.LANCZOS)
+                if image_format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+                    image = image.convert("RGB")
+                out = io.BytesIO()
+                if image_format == "PNG":
+                    image.save(out, "PNG", optimize=True)
+                else:
+                    image.save(out, image_format, quality=JPEG_QUALITY, optimize=True)
+            # Recompressing at full size can grow a well-packed file; keep the smaller
+            return out.getvalue() if resized or out.tell() < len(original) else original
+
+        key = self._key("image", self._digest(path), str(max_px), str(JPEG_QUALITY))
+        entry = self._store("images", key, path.suffix.lower(), produce)
+        summary["images"] += 1
+        summary["bytes_in"] += path.stat().st_size
+        summary["bytes_out"] += entry.stat().st_size
+        return entry
+
+    def _local_asset(
+        self, ref: str, base_dir: Path, chars: str, max_px: int, summary: dict,
+        imports: tuple[Path, ...] = (), faces: set[tuple[int, str]] | None = None,
+    ) -> Path | None:
+        """Processed (or, when unprocessable, original) file for a local reference; None if remote/missing."""
+        path = resolve_local_ref(ref, base_dir)
+        if path is None:
+            return None
+        suffix = path.suffix.lower()
+        try:
+            if suffix == ".css":
+                return self.print_css(path, chars, summary, imports, faces)
+            if suffix in FONT_SUFFIXES and font_subset is not None:
+                return self.subset_font(path.read_bytes(), chars, summary)
+            if suffix in IMAGE_FORMATS and Image is not None:
+                return self.print_image(path, max_px, summary)
+        except Exception as e:
+            summary["warnings"].append(f"{ref}: {type(e).__name__}: {e}")
+        return path
+
+    def rewrite_css(
+        self, css: str, base_dir: Path, chars: str, summary: dict,
+        imports: tuple[Path, ...] = (), faces: set[tuple[int, str]] | None = None,
+    ) -> str:
+        """
+        Point the url()s and @imports of CSS in base_dir that have processed
+        versions at those (relative to base_dir); other references are kept.
+        @imports of Google Fonts stylesheets become local @font-face rules.
+        `imports` are the stylesheets importing this one, to stop cycles;
+        `faces` (see used_faces) limits the Google Fonts faces kept.
+        """
+        max_px = round(CONTENT_WIDTH_IN * self.dpi)
+        font_faces = []
+
+        def swap_google(m: re.Match) -> str:
+            href = (m.group(2) or m.group(4)).strip()
+            if not any(host in href for host in GOOGLE_FONTS_HOSTS):
+                return m.group(0)
+            try:
+                font_faces.append(self.google_fonts_css(href, base_dir, chars, summary, faces))
+            except Exception as e:
+                summary["warnings"].append(f"Google Fonts unavailable, keeping remote @import: {e}")
+                return m.group(0)
+            return ""
+
+        def processed(ref: str) -> str | None:
+            asset = self._local_asset(ref, base_dir, chars, max_px, summary, imports, faces)
+            if asset is None or not asset.is_relative_to(self.cache_dir):
+                return None
+            return relative_ref(asset, base_dir)
+
+        def swap_url(m: re.Match) -> str:
+            ref = processed(m.group(2))
+            return m.group(0) if ref is None else f'url("{ref}")'
+
+        def swap_import(m: re.Match) -> str:
+            ref = processed(m.group(3))
+            return m.group(0) if ref is None else f'{m.group(1)}"{ref}"'
+
+        css = CSS_IMPORT_RULE_RE.sub(swap_google, css)
+        css = CSS_IMPORT_RE.sub(swap_import, CSS_URL_RE.sub(swap_url, css))
+        if font_faces:
+            # Appended: any other @import rules must stay ahead of them to apply
+            css = css.rstrip() + "\n" + "".join(font_faces)
+        return FONT_FORMAT_RE.sub(r'\1format("\2")', css)
+
+    def print_css(
+        self, path: Path, chars: str, summary: dict,
+        imports: tuple[Path, ...] = (), faces: set[tuple[int, str]] | None = None,
+    ) -> Path:
+        """
+        A stylesheet with its assets and imports processed, stored in the
+        cache; the original file when nothing it references changed.
+        """
+        if path in imports:
+            return path  # @import cycle
+        css = path.read_text(encoding="utf-8", errors="replace")
+        rewritten = self.rewrite_css(css, path.parent, chars, summary, (*imports, path), faces)
+        if rewritten == css:
+            return path
+        # Unprocessed references still point next to the original
+        css_dir = self.cache_dir / "css"
+        rewritten = rebase_css(rewritten, path.parent, css_dir)
+        return self._store("css", self._key("css", rewritten), ".css", rewritten.encode)
+
+    def google_fonts_css(
+        self, href: str, target_dir: Path, chars: str, summary: dict, faces: set[tuple[int, str]] | None = None
+    ) -> str:
+        """
+        Local @font-face rules for a Google Fonts stylesheet link. With
+        `faces`, only the rules the browser would pick for them are kept
+        (and their font files fetched).
+        """
+        css = self.fetch(html.unescape(href)).decode("utf-8")
+        if faces is not None:
+            css = select_font_faces(css, faces)
+
+        def swap(m: re.Match) -> str:
+            data = self.fetch(m.group(2))
+            if font_subset is None:
+                entry = self._store("fonts", self._key("font", hashlib.sha256(data).hexdigest()), ".ttf", lambda: data)
+            else:
+                entry = self.subset_font(data, chars, summary)
+            return f'url("{relative_ref(entry, target_dir)}")'
+
+        return FONT_FORMAT_RE.sub(r'\1format("\2")', CSS_URL_RE.sub(swap, css))
+
+    def process(self, html_path: Path) -> dict:
+        """
+        Write html_path's print-ready twin (<name>.print.html) with local,
+        processed assets. Returns a summary: the new path under "html",
+        counts, byte totals and any warnings.
+        """
+        started = time.perf_counter()
+        summary = {"fonts": 0, "images": 0, "bytes_in": 0, "bytes_out": 0, "warnings": []}
+        html_path = html_path.resolve()
+        base_dir = html_path.parent
+        page = html_path.read_text(encoding="utf-8")
+        chars = used_chars(page)
+        faces = used_faces(page_css(page, base_dir))
+        content_px = round(CONTENT_WIDTH_IN * self.dpi)
+
+        def swap_link(m: re.Match) -> str:
+            tag = m.group(0)
+            attrs = tag_attrs(tag)
+            href = attrs.get("href", "")
+            rel = attrs.get("rel", "").lower().split()
+            if any(host in href for host in GOOGLE_FONTS_HOSTS):
+                if "stylesheet" not in rel:
+                    return ""  # preconnect/preload hints for fonts now served locally
+                try:
+                    return f"<style>\n{self.google_fonts_css(href, base_dir, chars, summary, faces)}</style>"
+                except Exception as e:
+                    summary["warnings"].append(f"Google Fonts unavailable, keeping remote link: {e}")
+                    return tag
+            if "stylesheet" not in rel:
+                return tag
+            css_path = self._local_asset(href, base_dir, chars, content_px, summary, faces=faces)
+            if css_path is None or css_path.suffix.lower() != ".css" or not css_path.is_relative_to(self.cache_dir):
+                return tag
+            return replace_attr(tag, "href", relative_ref(css_path, base_dir))
+
+        def swap_img(m: re.Match) -> str:
+            tag = m.group(0)
+            attrs = tag_attrs(tag)
+            max_px = content_px
+            width = attrs.get("width", "").strip().removesuffix("px")
+            if width.isdigit():
+                max_px = min(max_px, max(1, round(int(width) / CSS_PX_PER_IN * self.dpi)))
+            asset = self._local_asset(attrs.get("src", ""), base_dir, chars, max_px, summary)
+            if asset is None:
+                return tag
+            return replace_attr(tag, "src", relative_ref(asset, base_dir))
+
+        def swap_style(m: re.Match) -> str:
+            return m.group(1) + self.rewrite_css(m.group(2), base_dir, chars, summary, faces=faces) + m.group(3)
+
+        # Inline styles first, so the @font-face blocks inserted for Google Fonts are not re-processed
+        page = STYLE_RE.sub(swap_style, page)
+        page = LINK_RE.sub(swap_link, page)
+        page = IMG_RE.sub(swap_img, page)
+
+        print_path = html_path.with_name(f"{html_path.stem}.print.html")
+        if not print_path.exists() or print_path.read_text(encoding="utf-8") != page:
+            # Batch jobs over one report may write this at once
+            with atomic_write(print_path) as tmp:
+                tmp.write_text(page, encoding="utf-8")
+        summary["html"] = print_path
+        summary["ms"] = round((time.perf_counter() - started) * 1000)
+        return summary
+
+
+def format_summary(summary: dict) -> str:
+    """One-line console summary of a process() run."""
+    saved = ""
+    if summary["bytes_in"]:
+        saved = f", {summary['bytes_in'] // 1024} KB -> {summary['bytes_out'] // 1024} KB"
+    return f"{summary['fonts']} fonts, {summary['images']} images{saved}, {summary['ms']}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare a report's fonts and images for print rendering")
+    parser.add_argument("html", nargs="+", help="HTML report(s) to process")
+    parser.add_argument("--dpi", type=int, default=PRINT_DPI, help=f"Image resolution target (default: {PRINT_DPI})")
+    args = parser.parse_args()
+
+    pipeline = AssetPipeline(dpi=args.dpi)
+    failed = False
+    for name in args.html:
+        path = Path(name)
+        if not path.exists():
+            print(f"Error: File not found: {path}", file=sys.stderr)
+            failed = True
+            continue
+        summary = pipeline.process(path)
+        print(f"{summary['html']} ({format_summary(summary)})")
+        for warning in summary["warnings"]:
+            print(f"  WARNING {warning}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,20 @@
-import docx
-import os
-import glob
+"""
+Extract text from the .docx files in data/ (shortcut for
+`python src/extract_sources.py --types docx`).
 
-data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+Writes output/sources-docx.jsonl by default, so it never replaces the full
+extraction in output/sources.jsonl.
 
-for f in sorted(glob.glob(os.path.join(data_dir, '*.docx'))):
-    basename = os.path.basename(f)
-    print(f'\n===== {basename} =====')
-    try:
-        doc = docx.Document(f)
-        text = '\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
-        if len(text) > 3000:
-            print(text[:3000] + '\n... [truncated]')
-        else:
-            print(text)
-    except Exception as e:
-        print(f'ERROR: {e}')
+Usage:
+    python src/extract_docx.py [--out output/sources-docx.jsonl]
+"""
+
+import sys
+
+from extract_sources import main
+from extraction import DEFAULT_OUTPUT
+
+DOCX_OUTPUT = DEFAULT_OUTPUT.with_name("sources-docx.jsonl")
+
+if __name__ == "__main__":
+    main(["--types", "docx", *sys.argv[1:]], default_output=DOCX_OUTPUT)
@@ -1,86 +1,121 @@
-import docx
-import os
-import glob
+"""
+Extract source text from the .docx and .pdf files in data/.
+
+Files are parsed in parallel and cached by path + mtime + size, so re-runs
+only touch changed documents. Output is one JSON line per document.
+
+Usage:
+    python src/extract_sources.py
+    python src/extract_sources.py --data data/ --out output/sources.jsonl --jobs 8
+    python src/extract_sources.py --types docx --out -
+    python src/extract_sources.py --max-tokens 500 --budget "*Transcript*=12000"
+    python src/extract_sources.py --benchmark      # rank installed backends
+    python src/extract_sources.py --index          # also update the passage index
+
+Budgets are in characters per document (--max-tokens converts at ~4 chars
+per token). Parsing stops once a document's budget is spent.
+"""
+
+import argparse
 import sys
+from pathlib import Path
+
+from extraction import (
+    CHARS_PER_TOKEN,
+    DATA_DIR,
+    DEFAULT_OUTPUT,
+    MAX_CHARS,
+    ExtractCache,
+    RANKING_PATH,
+    backend_order,
+    benchmark_backends,
+    extract_corpus,
+    find_sources,
+    write_jsonl,
+)
+
+
+def main(argv: list[str] | None = None, default_output: Path = DEFAULT_OUTPUT):
+    parser = argparse.ArgumentParser(description="Extract text from source documents")
+    parser.add_argument("--data", default=str(DATA_DIR), help="Source directory (default: data/)")
+    parser.add_argument("--out", default=str(default_output),
+                        help=f"JSONL output path, or - for stdout (default: output/{default_output.name})")
+    parser.add_argument("--types", nargs="+", choices=["docx", "pdf"], default=["docx", "pdf"],
+                        help="Document types to extract (default: docx pdf)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-chars", type=int, default=MAX_CHARS,
+                        help=f"Corpus-wide character budget per document (default: {MAX_CHARS})")
+    parser.add_argument("--max-tokens", type=int,
+                        help=f"Corpus-wide token budget per document (~{CHARS_PER_TOKEN} chars/token; overrides --max-chars)")
+    parser.add_argument("--budget", action="append", default=[], metavar="PATTERN=CHARS",
+                        help="Per-file character budget for file names matching PATTERN (repeatable)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-extract every file")
+    parser.add_argument("--index", action="store_true",
+                        help="Also update the full-text passage index (query with src/source_index.py)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time each installed backend on --data and record the fastest as default")
+    args = parser.parse_args(argv)
+
+    max_chars = args.max_tokens * CHARS_PER_TOKEN if args.max_tokens else args.max_chars
+    budgets: dict[str, int] = {}
+    for spec in args.budget:
+        pattern, _, chars = spec.rpartition("=")
+        if not pattern or not chars.isdigit():
+            parser.error(f"--budget expects PATTERN=CHARS, got {spec!r}")
+        budgets[pattern] = int(chars)
+
+    sources = find_sources(Path(args.data), tuple(f".{t}" for t in args.types))
+    if not sources:
+        print(f"No source documents found in {args.data}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.benchmark:
+        results = benchmark_backends(sources)
+        for doc_type, rows in results.items():
+            print(f"\n{doc_type} ({rows[0]['files']} files)")
+            for row in rows:
+                failed = f", {row['failures']} failed" if row["failures"] else ""
+                print(f"  {row['backend']:<12} {row['seconds']:>8.3f}s  {row['chars_per_sec']:>12,} chars/s{failed}")
+        print(f"\nDefault order recorded in {RANKING_PATH}")
+        for doc_type in results:
+            print(f"  {doc_type}: {' -> '.join(backend_order(doc_type))}")
+        return
+
+    records = extract_corpus(
+        sources,
+        jobs=args.jobs,
+        cache=None if args.no_cache else ExtractCache(),
+        max_chars=max_chars,
+        budgets=budgets,
+    )
+
+    if args.out == "-":
+        sys.stdout.reconfigure(encoding="utf-8")
+        write_jsonl(records, sys.stdout)
+    else:
+        write_jsonl(records, args.out)
+
+    cached = sum(1 for r in records if r.get("cached"))
+    failed = [r for r in records if "error" in r]
+    print(
+        f"Extracted {len(records)} documents ({cached} cached, {len(failed)} failed)"
+        + ("" if args.out == "-" else f" -> {args.out}"),
+        file=sys.stderr,
+    )
+    for record in failed:
+        print(f"  ERROR {record['name']}: {record['error']}", file=sys.stderr)
+
+    if args.index:
+        from source_index import SourceIndex
+
+        with SourceIndex() as index:
+            counts = index.update(sources, jobs=args.jobs, prune=set(args.types) == {"docx", "pdf"})
+        print(
+            f"Index: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['removed']} removed, {counts['unchanged']} unchanged -> {index.path}",
+            file=sys.stderr,
+        )
+
 
-# Force UTF-8 output
-sys.stdout.reconfigure(encoding='utf-8')
-
-data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
-
-# Extract remaining docx files that had encoding errors
-problem_files = [
-    'Abaxx_Metcalf_Transcript_Summary_August2025.docx',
-    'Abaxx_Problem_Solutions_Doc_September2025.docx',
-    'Why Stablecoins Can\'t Meet Margin Requirements.docx',
-    'Why does Legal Finality beat Ledger Finality.docx',
-]
-
-for basename in problem_files:
-    f = os.path.join(data_dir, basename)
-    print(f'\n===== {basename} =====')
-    try:
-        doc = docx.Document(f)
-        text = '\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
-        if len(text) > 3000:
-            print(text[:3000] + '\n... [truncated]')
-        else:
-            print(text)
-    except Exception as e:
-        print(f'ERROR: {e}')
-
-# Extract PDFs using PyPDF2 or pdfplumber
-print('\n\n===== PDF FILES =====')
-try:
-    import PyPDF2
-    pdf_lib = 'PyPDF2'
-except ImportError:
-    try:
-        import pdfplumber
-        pdf_lib = 'pdfplumber'
-    except ImportError:
-        pdf_lib = None
-        print('No PDF library available, trying pymupdf...')
-        try:
-            import fitz
-            pdf_lib = 'fitz'
-        except ImportError:
-            print('No PDF library available at all')
-
-for f in sorted(glob.glob(os.path.join(data_dir, '*.pdf'))):
-    basename = os.path.basename(f)
-    print(f'\n===== {basename} =====')
-    try:
-        if pdf_lib == 'PyPDF2':
-            reader = PyPDF2.PdfReader(f)
-            text = ''
-            for i, page in enumerate(reader.pages[:10]):
-                text += page.extract_text() or ''
-            if len(text) > 3000:
-                print(text[:3000] + '\n... [truncated]')
-            else:
-                print(text)
-        elif pdf_lib == 'pdfplumber':
-            with pdfplumber.open(f) as pdf:
-                text = ''
-                for page in pdf.pages[:10]:
-                    text += (page.extract_text() or '') + '\n'
-            if len(text) > 3000:
-                print(text[:3000] + '\n... [truncated]')
-            else:
-                print(text)
-        elif pdf_lib == 'fitz':
-            doc = fitz.open(f)
-            text = ''
-            for i, page in enumerate(doc):
-                if i >= 10:
-                    break
-                text += page.get_text()
-            if len(text) > 3000:
-                print(text[:3000] + '\n... [truncated]')
-            else:
-                print(text)
-        else:
-            print('No PDF library available')
-    except Exception as e:
-        print(f'ERROR: {e}')
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+Source Extraction Engine
+
+Extracts text from the .docx and .pdf sources in data/ across a process pool.
+Results are cached on disk keyed on path + mtime + size (plus the extraction
+settings), so unchanged files are never parsed twice; the least recently
+used entries are evicted beyond MAX_ENTRIES. Each document becomes one JSON
+Lines record with its metadata.
+
+Extraction is streaming: docx paragraphs and PDF pages are yielded one at a
+time and parsing stops as soon as the document's character budget is spent,
+so previewing a corpus costs time proportional to the budget, not to the
+size of the documents.
+
+Each document type has a registry of backends (docx: a streaming XML
+reader and python-docx; pdf: PyMuPDF, pdfplumber, pypdf, PyPDF2). They are
+tried in preference order per file, falling back to the next backend when
+one fails. benchmark_backends() times every installed backend on a sample
+corpus and records the fastest as the default order.
+
+Usage:
+    from extraction import extract_corpus, find_sources
+    records = extract_corpus(find_sources(DATA_DIR), budgets={"*_Transcript_*": 8000})
+"""
+
+import fnmatch
+import hashlib
+import importlib.util
+import json
+import os
+import time
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from xml.etree import ElementTree
+
+from render_cache import atomic_write, evict_lru
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+CACHE_DIR = PROJECT_ROOT / ".cache" / "extract"
+# Backend order chosen by the last benchmark run
+RANKING_PATH = CACHE_DIR / "backend-ranking.json"
+DEFAULT_OUTPUT = PROJECT_ROOT / "output" / "sources.jsonl"
+
+SOURCE_SUFFIXES = (".docx", ".pdf")
+
+# Preview limits carried over from the original extraction scripts
+MAX_CHARS = 3000
+MAX_PDF_PAGES = 10
+
+MAX_ENTRIES = 2000
+# Cache entries are <sha256 hex>.json; the glob leaves backend-ranking.json alone
+ENTRY_PATTERN = "?" * 64 + ".json"
+
+# Rough English average, used to turn token budgets into character budgets
+CHARS_PER_TOKEN = 4
+
+# Bump to invalidate cached records when the record format changes
+CACHE_VERSION = "3"
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@dataclass(frozen=True)
+class Backend:
+    """A text extractor for one document type."""
+
+    name: str
+    doc_type: str
+    module: str  # import needed for the backend to be usable
+    iterate: Callable[[Path, int], Iterator[str]]  # (path, max_pages) -> text chunks
+    sep: str = ""  # joiner between chunks
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+
+BACKENDS: dict[str, dict[str, Backend]] = {"docx": {}, "pdf": {}}
+
+# Order used when no benchmark ranking has been recorded
+DEFAULT_PREFERENCE = {
+    "docx": ["docx-stream", "python-docx"],
+    "pdf": ["pymupdf", "pdfplumber", "pypdf", "PyPDF2"],
+}
+
+
+def register_backend(doc_type: str, name: str, module: str, sep: str = ""):
+    """Decorator: register a chunk iterator as an extraction backend."""
+    def decorator(fn):
+        BACKENDS[doc_type][name] = Backend(name, doc_type, module, fn, sep)
+        return fn
+    return decorator
+
+
+def backend_order(doc_type: str) -> list[str]:
+    """
+    Installed backends for a document type, fastest first: the recorded
+    benchmark ranking, then any remaining backends in default order.
+    """
+    try:
+        ranked = json.loads(RANKING_PATH.read_text(encoding="utf-8")).get(doc_type, [])
+    except (FileNotFoundError, json.JSONDecodeError):
+        ranked = []
+    order = [n for n in ranked if n in BACKENDS[doc_type]]
+    order += [n for n in DEFAULT_PREFERENCE[doc_type] if n not in order]
+    order += [n for n in BACKENDS[doc_type] if n not in order]
+    return [n for n in order if BACKENDS[doc_type][n].available]
+
+
+@register_backend("docx", "docx-stream", "zipfile", sep="\n")
+def iter_docx_paragraphs(path: Path, max_pages: int = 0) -> Iterator[str]:
+    """
+    Yield the non-empty paragraphs of a .docx in document order, parsing
+    word/document.xml incrementally so a caller that stops early never
+    reads the rest of the document.
+    """
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+        parts: list[str] = []
+        for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == f"{WORD_NS}p":
+                    parts = []
+                continue
+            if tag == f"{WORD_NS}t":
+                parts.append(elem.text or "")
+            elif tag == f"{WORD_NS}tab":
+                parts.append("\t")
+            elif tag in (f"{WORD_NS}br", f"{WORD_NS}cr"):
+                parts.append("\n")
+            elif tag == f"{WORD_NS}p":
+                text = "".join(parts)
+                if text.strip():
+                    yield text
+            # Drop finished paragraphs so memory stays flat
+            if tag == f"{WORD_NS}p":
+                elem.clear()
+
+
+@register_backend("docx", "python-docx", "docx", sep="\n")
+def iter_python_docx_paragraphs(path: Path, max_pages: int = 0) -> Iterator[str]:
+    import docx
+
+    for paragraph in docx.Document(str(path)).paragraphs:
+        if paragraph.text.strip():
+            yield paragraph.text
+
+
+@register_backend("pdf", "pymupdf", "fitz")
+def iter_pymupdf_pages(path: Path, max_pages: int = MAX_PDF_PAGES) -> Iterator[str]:
+    import fitz
+
+    with fitz.open(str(path)) as doc:
+        for i in range(min(max_pages, doc.page_count)):
+            yield doc[i].get_text()
+
+
+@register_backend("pdf", "pdfplumber", "pdfplumber")
+def iter_pdfplumber_pages(path: Path, max_pages: int = MAX_PDF_PAGES) -> Iterator[str]:
+    import pdfplumber
+
+    with pdfplumber.open(str(path)) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield (page.extract_text() or "") + "\n"
+
+
+@register_backend("pdf", "pypdf", "pypdf")
+def iter_pypdf_pages(path: Path, max_pages: int = MAX_PDF_PAGES) -> Iterator[str]:
+    import pypdf
+
+    reader = pypdf.PdfReader(str(path))
+    for page in reader.pages[:max_pages]:
+        yield page.extract_text() or ""
+
+
+@register_backend("pdf", "PyPDF2", "PyPDF2")
+def iter_pypdf2_pages(path: Path, max_pages: int = MAX_PDF_PAGES) -> Iterator[str]:
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(str(path))
+    for page in reader.pages[:max_pages]:
+        yield page.extract_text() or ""
+
+
+def take_budget(chunks: Iterable[str], max_chars: int, sep: str = "") -> tuple[str, bool]:
+    """
+    Join chunks until `max_chars` is reached, then stop pulling from the
+    iterator. Returns the text (at most max_chars long) and whether
+    anything was left unread.
+    """
+    parts: list[str] = []
+    used = 0
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            piece = (sep if parts else "") + chunk
+            if used + len(piece) >= max_chars:
+                parts.append(piece[:max_chars - used])
+                truncated = used + len(piece) > max_chars or any(c.strip() for c in iterator)
+                return "".join(parts), truncated
+            parts.append(piece)
+            used += len(piece)
+        return "".join(parts), False
+    finally:
+        # Close generators so open files are released immediately
+        close = getattr(iterator, "close", None)
+        if close:
+            close()
+
+
+def budget_for(path: Path, max_chars: int, budgets: dict[str, int] | None = None) -> int:
+    """
+    Character budget for one document: the first matching per-file
+    pattern in `budgets` (fnmatch against the file name), else the corpus
+    default `max_chars`.
+    """
+    for pattern, chars in (budgets or {}).items():
+        if fnmatch.fnmatch(path.name, pattern):
+            return chars
+    return max_chars
+
+
+def extract_file(path: Path, max_chars: int = MAX_CHARS, backends: list[str] | None = None) -> dict:
+    """
+    Extract one source document into a JSON-serialisable record, trying
+    backends in order and falling back to the next one on error.
+    Never raises.
+    """
+    stat = path.stat()
+    doc_type = path.suffix.lstrip(".").lower()
+    record = {
+        "path": str(path),
+        "name": path.name,
+        "type": doc_type,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "budget": max_chars,
+    }
+    order = backends if backends is not None else backend_order(doc_type)
+    if not order:
+        record["error"] = f"No {doc_type} extraction backend installed"
+        return record
+
+    failures: list[str] = []
+    for name in order:
+        backend = BACKENDS[doc_type][name]
+        try:
+            text, truncated = take_budget(backend.iterate(path, MAX_PDF_PAGES), max_chars, sep=backend.sep)
+        except Exception as e:
+            failures.append(f"{name}: {type(e).__name__}: {e}")
+            continue
+        record["backend"] = name
+        record["chars"] = len(text)
+        record["truncated"] = truncated
+        record["text"] = text
+        if failures:
+            record["fallbacks"] = failures
+        return record
+
+    record["error"] = "; ".join(failures)
+    return record
+
+
+class ExtractCache:
+    """On-disk record store keyed on path + mtime + size + settings."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def key(self, path: Path, settings: dict) -> str:
+        stat = path.stat()
+        raw = json.dumps(
+            [CACHE_VERSION, str(path.resolve()), stat.st_mtime_ns, stat.st_size, settings],
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        entry = self.cache_dir / f"{key}.json"
+        try:
+            record = json.loads(entry.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(entry)  # mark as most recently used
+        return record
+
+    def put(self, key: str, record: dict) -> None:
+        # Failed extractions are retried next run rather than cached
+        if "error" in record:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.cache_dir / f"{key}.json") as tmp:
+            tmp.write_text(json.dumps(record), encoding="utf-8")
+
+    def evict(self) -> int:
+        """Drop least recently used entries beyond the budget. Returns count removed."""
+        return len(evict_lru(self.cache_dir, ENTRY_PATTERN, self.max_entries))
+
+
+def find_sources(data_dir: Path = DATA_DIR, types: tuple[str, ...] = SOURCE_SUFFIXES) -> list[Path]:
+    """Source documents directly inside data_dir, sorted by name."""
+    if not data_dir.is_dir():
+        return []
+    # Skip Word lock files such as ~$report.docx
+    return sorted(
+        p for p in data_dir.iterdir()
+        if p.is_file() and p.suffix.lower() in types and not p.name.startswith("~$")
+    )
+
+
+def extract_corpus(
+    paths: list[Path],
+    jobs: int | None = None,
+    cache: ExtractCache | None = None,
+    max_chars: int = MAX_CHARS,
+    budgets: dict[str, int] | None = None,
+) -> list[dict]:
+    """
+    Extract every path, reusing cached records for unchanged files and
+    parsing the rest across a process pool. `max_chars` is the corpus-wide
+    budget per document; `budgets` maps file-name patterns to per-file
+    overrides. Records come back in input order, each with a 'cached' flag.
+    """
+    file_budgets = [budget_for(path, max_chars, budgets) for path in paths]
+    orders = {doc_type: backend_order(doc_type) for doc_type in BACKENDS}
+    file_orders = [orders.get(path.suffix.lstrip(".").lower(), []) for path in paths]
+    records: list[dict | None] = [None] * len(paths)
+    misses: list[tuple[int, str]] = []
+
+    for n, path in enumerate(paths):
+        settings = {"max_chars": file_budgets[n], "max_pdf_pages": MAX_PDF_PAGES, "backends": file_orders[n]}
+        key = cache.key(path, settings) if cache else None
+        hit = cache.get(key) if cache else None
+        if hit is not None:
+            records[n] = {**hit, "cached": True}
+        else:
+            misses.append((n, key))
+
+    if len(misses) == 1 or jobs == 1:
+        fresh = [extract_file(paths[n], file_budgets[n], file_orders[n]) for n, _ in misses]
+    elif misses:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = list(pool.map(
+                extract_file,
+                [paths[n] for n, _ in misses],
+                [file_budgets[n] for n, _ in misses],
+                [file_orders[n] for n, _ in misses],
+            ))
+    else:
+        fresh = []
+
+    for (n, key), record in zip(misses, fresh):
+        if cache:
+            cache.put(key, record)
+        records[n] = {**record, "cached": False}
+    if cache and misses:
+        cache.evict()
+    return records
+
+
+def write_jsonl(records: list[dict], output) -> None:
+    """Write records as JSON Lines to a path, or to an open stream."""
+    if hasattr(output, "write"):
+        for record in records:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        write_jsonl(records, f)
+
+
+def benchmark_backends(paths: list[Path], repeat: int = 3, record: bool = True) -> dict:
+    """
+    Time every installed backend on a sample corpus (full text of the
+    first MAX_PDF_PAGES pages, no character budget). Backends are ranked
+    by total time; any backend that fails on a sample file ranks last.
+    With `record`, the ranking becomes the default backend order.
+    Returns {doc_type: [{backend, seconds, files, chars, chars_per_sec, failures}]}.
+    """
+    results: dict[str, list[dict]] = {}
+    for doc_type in BACKENDS:
+        sample = [p for p in paths if p.suffix.lstrip(".").lower() == doc_type]
+        if not sample:
+            continue
+        rows = []
+        for name in DEFAULT_PREFERENCE[doc_type] + [n for n in BACKENDS[doc_type] if n not in DEFAULT_PREFERENCE[doc_type]]:
+            backend = BACKENDS[doc_type][name]
+            if not backend.available:
+                continue
+            failures = 0
+            chars = 0
+            best = float("inf")
+            for _ in range(repeat):
+                failures = chars = 0
+                started = time.perf_counter()
+                for path in sample:
+                    try:
+                        chars += sum(len(chunk) for chunk in backend.iterate(path, MAX_PDF_PAGES))
+                    except Exception:
+                        failures += 1
+                best = min(best, time.perf_counter() - started)
+            rows.append({
+                "backend": name,
+                "seconds": round(best, 4),
+                "files": len(sample),
+                "chars": chars,
+                "chars_per_sec": round(chars / best) if best > 0 else 0,
+                "failures": failures,
+            })
+        rows.sort(key=lambda r: (r["failures"] > 0, r["seconds"]))
+        results[doc_type] = rows
+
+    if record and results:
+        try:
+            ranking = json.loads(RANKING_PATH.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            ranking = {}
+        ranking.update({doc_type: [r["backend"] for r in rows] for doc_type, rows in results.items()})
+        RANKING_PATH.parent.mkdir(parents=True, exist_ok=True)
+        RANKING_PATH.write_text(json.dumps(ranking, indent=2), encoding="utf-8")
+    return results
@@ -9,12 +9,34 @@ Usage:
     python src/generate.py --data data/ --template report --preview
     python src/generate.py --data data/ --template report --output output/report.pdf --iterate
     python src/generate.py --data data/ --template report --output output/report.pdf --preset marketing-report
+    python src/generate.py --data data/report.json --template report --output output/report.pdf --chunks 4
+    python src/generate.py --batch batch.yaml --workers 4
+    python src/generate.py --renderer fpdf --markdown output/content.md --output output/draft.pdf
+    python src/generate.py --data data/report.json --template report --preview --strict-undefined
+
+Batch manifest (paths relative to project root):
+    workers: 4                          # optional, default 2
+    summary: output/batch-summary.json  # optional
+    jobs:
+      - html: output/report.html
+        preset: consultant-report
+        output: output/report.pdf
+      - data: data/q3.json              # rendered through templates/report.html
+        template: report
+        output: output/q3.pdf           # HTML goes next to it (output/q3.html)
 """
 
 import argparse
+import atexit
 import json
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 try:
@@ -22,12 +44,69 @@ try:
 except ImportError:
     yaml = None
 
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+from asset_server import SERVED_DIRS, AssetServer
+from assets import AssetPipeline, format_summary, visible_text
+from incremental import IncrementalReport
+from render_cache import RenderCache
+from render_worker import RenderWorker, RenderWorkerError
+from validate import QAResult, validate_report
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = PROJECT_ROOT / "templates"
+JINJA_CACHE_DIR = PROJECT_ROOT / ".cache" / "jinja"
+
+# page.pdf() options shared by every Playwright render
+PDF_OPTIONS = {
+    "format": "Letter",
+    "printBackground": True,
+    "preferCSSPageSize": True,
+    "margin": {"top": "0", "right": "0", "bottom": "0", "left": "0"},
+}
+
+# Reusable Chromium pages kept open by the render worker
+RENDER_PAGES = 2
+
+# How the worker decides the page is ready to print:
+#   "ready" = wait for document.fonts.ready, image decode and an optional
+#             window.reportReady promise (bounded by READY_TIMEOUT_MS)
+#   "fixed" = networkidle plus the legacy 3-second font settle
+RENDER_WAIT = "ready"
+READY_TIMEOUT_MS = 10000
+
+# Chunked rendering (--chunks): every chunk loads the whole report in its
+# own browser page and prints one page range, so layout, page counters and
+# running headers are exactly those of a single render. Reports shorter than
+# two chunks of CHUNK_MIN_PAGES render in one pass.
+CHUNK_MIN_PAGES = 20
+# Rough printed characters per page, to size chunks when no previous PDF exists
+CHARS_PER_PAGE = 3000
+
+# Markdown content rendered by the browser-free fpdf renderer
+DEFAULT_MARKDOWN = "output/content.md"
+
+_render_worker: RenderWorker | None = None
+_asset_server: AssetServer | None = None
+_asset_server_lock = threading.Lock()
+
+
+def get_preset_path(preset_name: str) -> Path:
+    """Path of a preset YAML in the presets/ directory (may not exist)."""
+    return PROJECT_ROOT / "presets" / f"{preset_name}.yaml"
 
 
 def load_preset(preset_name: str) -> dict:
     """Load a report type preset from the presets/ directory."""
-    preset_path = PROJECT_ROOT / "presets" / f"{preset_name}.yaml"
+    preset_path = get_preset_path(preset_name)
     if not preset_path.exists():
         print(f"Error: Preset not found: {preset_path}", file=sys.stderr)
         available = [p.stem for p in (PROJECT_ROOT / "presets").glob("*.yaml")]
@@ -62,111 +141,339 @@ def load_data(data_path: str) -> dict:
     return data
 
 
-def generate_html(data_path: str, template_name: str) -> Path:
+@lru_cache(maxsize=None)
+def get_template_env(strict: bool = False) -> "jinja2.Environment":
     """
-    Generate the HTML report.
+    Jinja2 environment over templates/, shared by every render in the
+    process. Compiled templates are kept in memory (the environment's
+    template cache, re-checked against the file's mtime) and on disk as
+    bytecode in .cache/jinja/, so a template is parsed and compiled once
+    rather than per report. HTML output is autoescaped; mark trusted HTML
+    fragments with `| safe`. With `strict`, undefined variables raise.
+    """
+    JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=jinja2.select_autoescape(["html", "htm", "xml"]),
+        undefined=jinja2.StrictUndefined if strict else jinja2.Undefined,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
+        auto_reload=True,
+    )
 
-    Uses the pre-rendered HTML from the Design Agent output.
-    A future version could use Jinja2 templates with dynamic data injection.
+
+def template_file(template_name: str) -> str:
+    """'report' -> 'report.html'; names with a suffix are used as given."""
+    return template_name if Path(template_name).suffix else f"{template_name}.html"
+
+
+@lru_cache(maxsize=None)
+def get_incremental_report(template_name: str, strict: bool = False) -> IncrementalReport:
     """
-    html_path = PROJECT_ROOT / "output" / "report.html"
-    if not html_path.exists():
-        print(f"Error: HTML report not found at {html_path}", file=sys.stderr)
-        print("Run the Design Agent first to generate the HTML.", file=sys.stderr)
-        sys.exit(1)
+    Shared section-level renderer for a template: repeat renders in the
+    process (the --iterate loop) re-render and re-scan only changed sections.
+    """
+    return IncrementalReport(get_template_env(strict), template_file(template_name))
 
-    print(f"HTML report ready: {html_path}")
-    return html_path
 
+def render_template(template_name: str, data: dict, output_path: Path, strict: bool = False) -> Path:
+    """
+    Render templates/<template_name> with `data` to output_path. Raises
+    jinja2 errors (missing template, syntax, strict undefined) to the caller.
+    """
+    template = get_template_env(strict).get_template(template_file(template_name))
+    html = template.render(**data)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(html, encoding="utf-8")
+    return output_path
 
-def render_pdf_playwright(html_path: Path, output_path: Path) -> bool:
+
+def generate_html(
+    data_path: str,
+    template_name: str,
+    data: dict | None = None,
+    output_path: Path | None = None,
+    strict: bool = False,
+) -> Path:
     """
-    Render HTML to PDF using Playwright.
+    Generate the HTML report.
 
-    Starts a local HTTP server to serve the HTML (Playwright requires http://),
-    then uses Playwright's Chromium to render a print-quality PDF.
+    Renders templates/<template_name>.html with the JSON data to
+    output/<template_name>.html (or output_path), section by section: only
+    sections whose data changed since the last render (in this process or
+    a previous one, via .cache/sections/) are re-rendered. When the data is a
+    directory of source files rather than JSON, there is nothing to inject,
+    so the pre-rendered HTML from the Design Agent (output/report.html) is
+    used as before.
     """
-    import http.server
-    import threading
+    if data is None:
+        data = load_data(data_path)
+
+    if "_data_dir" in data:
+        html_path = PROJECT_ROOT / "output" / "report.html"
+        if not html_path.exists():
+            print(f"Error: HTML report not found at {html_path}", file=sys.stderr)
+            print("Run the Design Agent first to generate the HTML.", file=sys.stderr)
+            sys.exit(1)
+        print(f"HTML report ready: {html_path}")
+        return html_path
+
+    if jinja2 is None:
+        print("Error: Jinja2 is required to render templates (pip install jinja2).", file=sys.stderr)
+        sys.exit(1)
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path is None:
+        output_path = PROJECT_ROOT / "output" / f"{Path(template_file(template_name)).stem}.html"
+    started = time.perf_counter()
+    try:
+        counts = get_incremental_report(template_name, strict).render(data, output_path)
+    except jinja2.TemplateNotFound:
+        print(f"Error: Template not found: {TEMPLATES_DIR / template_file(template_name)}", file=sys.stderr)
+        available = [p.stem for p in TEMPLATES_DIR.glob("*.html")]
+        print(f"Available templates: {', '.join(available)}", file=sys.stderr)
+        sys.exit(1)
+    except jinja2.TemplateSyntaxError as e:
+        print(f"Error: Template syntax error in {e.name} line {e.lineno}: {e.message}", file=sys.stderr)
+        sys.exit(1)
+    except jinja2.UndefinedError as e:
+        print(f"Error: Template variable missing from data: {e.message}", file=sys.stderr)
+        sys.exit(1)
 
-    # Serve from project root so image paths resolve
-    serve_dir = PROJECT_ROOT
+    elapsed = round((time.perf_counter() - started) * 1000)
+    sections = f"{counts['rendered']}/{counts['fragments']} sections re-rendered, " if counts["fragments"] else ""
+    print(f"HTML report rendered: {output_path} ({sections}{elapsed}ms)")
+    return output_path
 
-    class QuietHandler(http.server.SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=str(serve_dir), **kwargs)
 
-        def log_message(self, format, *args):
-            pass  # suppress logs
+def get_render_worker(pages: int = RENDER_PAGES) -> RenderWorker:
+    """Return the shared render worker, creating it (with `pages` browser pages) on first use."""
+    global _render_worker
+    if _render_worker is None:
+        _render_worker = RenderWorker(pages=pages)
+        atexit.register(_render_worker.close)
+    return _render_worker
 
-    server = http.server.HTTPServer(("127.0.0.1", 0), QuietHandler)
-    port = server.server_address[1]
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
 
-    url = f"http://127.0.0.1:{port}/output/report.html"
-    pdf_posix = output_path.as_posix()
+def get_asset_server() -> AssetServer:
+    """Return the shared asset server, starting it on first use (batch threads share it)."""
+    global _asset_server
+    with _asset_server_lock:
+        if _asset_server is None:
+            _asset_server = AssetServer()
+            atexit.register(_asset_server.close)
+    return _asset_server
 
-    script = f"""
-const {{ chromium }} = require('playwright');
 
-(async () => {{
-    const browser = await chromium.launch();
-    const page = await browser.newPage();
-    await page.goto('{url}', {{ waitUntil: 'networkidle', timeout: 30000 }});
+@lru_cache(maxsize=None)
+def get_asset_pipeline() -> AssetPipeline:
+    """Shared asset pipeline, so batch renders hash shared fonts and images once."""
+    return AssetPipeline()
 
-    // Wait for Google Fonts to load
-    await page.waitForTimeout(3000);
 
-    await page.pdf({{
-        path: '{pdf_posix}',
-        format: 'Letter',
-        printBackground: true,
-        preferCSSPageSize: true,
-        margin: {{ top: '0', right: '0', bottom: '0', left: '0' }}
-    }});
+def format_timings(timings: dict) -> str:
+    """Format the worker's per-phase timing breakdown for the console."""
+    parts = [f"{phase} {ms}ms" for phase, ms in timings.items() if isinstance(ms, int)]
+    if timings.get("readyTimedOut"):
+        parts.append(f"ready timed out at {timings['readyTimedOut']}")
+    return ", ".join(parts)
 
-    await browser.close();
-    console.log('PDF generated successfully');
-}})();
-"""
 
-    script_path = PROJECT_ROOT / "src" / "_render.js"
-    try:
-        with open(script_path, "w", encoding="utf-8") as f:
-            f.write(script)
-
-        result = subprocess.run(
-            ["node", str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
+def estimate_pages(html_path: Path, previous_pdf: Path) -> int:
+    """Page count to size chunks by: the previous render's, else a guess from text length."""
+    if PdfReader is not None and previous_pdf.exists():
+        try:
+            return len(PdfReader(str(previous_pdf)).pages)
+        except Exception:
+            pass
+    text = visible_text(html_path.read_text(encoding="utf-8", errors="replace"))
+    return max(1, len(" ".join(text.split())) // CHARS_PER_PAGE)
 
-        if result.returncode == 0:
-            print(f"PDF rendered: {output_path}")
-            return True
-        else:
-            print(f"PDF render failed: {result.stderr}", file=sys.stderr)
-            return False
+
+def page_ranges(pages: int, chunks: int) -> list[str]:
+    """
+    Split pages 1..pages into up to `chunks` contiguous Chromium page
+    ranges of at least CHUNK_MIN_PAGES. The last range is open-ended, so an
+    underestimate still prints every page. [] means render in one pass.
+    """
+    chunks = min(chunks, pages // CHUNK_MIN_PAGES)
+    if chunks < 2:
+        return []
+    bounds = [round(pages * n / chunks) for n in range(chunks)]
+    ranges = [f"{start + 1}-{end}" for start, end in zip(bounds, bounds[1:])]
+    ranges.append(f"{bounds[-1] + 1}-")
+    return ranges
+
+
+def render_chunks(worker: RenderWorker, url: str, output_path: Path, ranges: list[str], **job) -> dict:
+    """
+    Print each page range of `url` in its own browser page, concurrently,
+    and merge the parts in order into output_path. Raises RenderWorkerError
+    if any chunk fails (e.g. the page count was overestimated).
+    """
+    with tempfile.TemporaryDirectory(prefix=".chunks-", dir=output_path.parent) as tmp:
+        parts = [Path(tmp) / f"part{n}.pdf" for n in range(len(ranges))]
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [
+                pool.submit(worker.render, url, part, {**PDF_OPTIONS, "pageRanges": pages}, **job)
+                for part, pages in zip(parts, ranges)
+            ]
+            replies = [future.result() for future in futures]
+
+        started = time.perf_counter()
+        writer = PdfWriter()
+        for part in parts:
+            writer.append(str(part))
+        merged = Path(tmp) / "merged.pdf"
+        with open(merged, "wb") as f:
+            writer.write(f)
+        os.replace(merged, output_path)
+        merge_ms = round((time.perf_counter() - started) * 1000)
+
+    render_ms = max(reply.get("ms", 0) for reply in replies)
+    return {"render": render_ms, "merge": merge_ms, "total": render_ms + merge_ms}
+
+
+def render_pdf_playwright(
+    html_path: Path,
+    output_path: Path,
+    worker: RenderWorker | None = None,
+    wait: str = RENDER_WAIT,
+    cache: RenderCache | None = None,
+    chunks: int = 1,
+    assets: bool = True,
+) -> dict | None:
+    """
+    Render HTML to PDF using Playwright.
+
+    Serves the HTML through the shared local asset server (Playwright
+    requires http://; only output/, styles/ and assets/ are exposed), then
+    hands the job to the persistent render worker, which keeps Chromium
+    warm between renders. With a cache, unchanged HTML + assets + options
+    are served from the render cache without starting a render.
+
+    With `assets`, the page actually printed is the asset pipeline's
+    <name>.print.html: Google Fonts vendored and subset, local fonts subset
+    and images downscaled to print resolution (see assets.py), so the render
+    needs no network and embeds no more than it prints.
+
+    With chunks > 1, a long report is printed as up to `chunks` page ranges
+    in parallel browser pages (the worker needs that many pages) and merged
+    with pypdf; if chunking fails it falls back to a single render.
+
+    Returns the per-phase timing breakdown in ms (plus 'total'),
+    or None if the render failed.
+    """
+    server = get_asset_server()
+    if not server.is_served(html_path):
+        served = ", ".join(f"{d}/" for d in SERVED_DIRS)
+        print(f"Error: HTML must live under {served} to be served: {html_path}", file=sys.stderr)
+        return None
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if assets:
+        summary = get_asset_pipeline().process(html_path)
+        print(f"Assets prepared: {summary['html']} ({format_summary(summary)})")
+        for warning in summary["warnings"]:
+            print(f"Warning: {warning}", file=sys.stderr)
+        html_path = summary["html"]
+
+    cache_key = None
+    if cache is not None:
+        started = time.perf_counter()
+        cache_key = cache.key(html_path, {"pdf": PDF_OPTIONS, "wait": wait})
+        if cache.fetch(cache_key, output_path):
+            elapsed = round((time.perf_counter() - started) * 1000)
+            print(f"PDF rendered: {output_path} (render cache hit, {elapsed}ms)")
+            return {"cache": elapsed, "total": elapsed}
+
+    url = server.url_for(html_path)
+
+    ranges = []
+    if chunks > 1 and PdfWriter is not None:
+        ranges = page_ranges(estimate_pages(html_path, output_path), chunks)
+
+    worker = worker or get_render_worker()
+    job = {"timeout": 60, "wait": wait, "readyTimeout": READY_TIMEOUT_MS}
+    timings = None
+    try:
+        if ranges:
+            try:
+                timings = render_chunks(worker, url, output_path.resolve(), ranges, **job)
+            except RenderWorkerError as e:
+                print(f"Chunked render failed ({e}); rendering in one pass.", file=sys.stderr)
+        if timings is None:
+            reply = worker.render(url, output_path.resolve(), PDF_OPTIONS, **job)
+            timings = {**reply.get("timings", {}), "total": reply.get("ms", 0)}
     except FileNotFoundError:
         print("Error: Node.js not found. Install Node.js for Playwright rendering.", file=sys.stderr)
-        return False
-    except subprocess.TimeoutExpired:
-        print("Error: PDF render timed out after 60s.", file=sys.stderr)
-        return False
-    finally:
-        script_path.unlink(missing_ok=True)
-        server.shutdown()
+        return None
+    except RenderWorkerError as e:
+        print(f"PDF render failed: {e}", file=sys.stderr)
+        return None
+
+    if cache_key is not None:
+        cache.store(cache_key, output_path)
+
+    chunked = f"{len(ranges)} chunks, " if "merge" in timings else ""
+    print(f"PDF rendered: {output_path} ({chunked}{format_timings(timings)})")
+    return timings
+
+
+def render_pdf_fpdf(markdown_path: Path, output_path: Path, preset_name: str, preset: dict) -> dict | None:
+    """
+    Render markdown content straight to PDF with the fpdf renderer
+    (generate_report_pdf.py): no browser, so a draft takes well under a
+    second. The theme comes from the preset; the frontmatter title, if any,
+    becomes the running header.
+
+    Returns {'render': ms, 'total': ms, 'pages': n}, or None on failure.
+    The page count estimates the Playwright render's, which may paginate
+    somewhat differently; it is checked against the preset's optional
+    integer `qa: max_pages` (internal-memo sets 2), with a warning when over.
+    """
+    if not markdown_path.exists():
+        print(f"Error: Markdown content not found: {markdown_path}", file=sys.stderr)
+        return None
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.append(str(PROJECT_ROOT))
+    try:
+        import generate_report_pdf as fpdf_renderer
+    except ImportError as e:
+        print(f"Error: fpdf renderer unavailable ({e}). Install fpdf2.", file=sys.stderr)
+        return None
+
+    try:
+        theme = fpdf_renderer.load_theme(preset_name)
+    except ValueError as e:
+        print(f"Warning: {e}; using the default fpdf theme.", file=sys.stderr)
+        theme = fpdf_renderer.DEFAULT_THEME
+
+    started = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    pages = fpdf_renderer.render_markdown(markdown_path, output_path, theme=theme)
+    elapsed = round((time.perf_counter() - started) * 1000)
+    print(f"Draft PDF rendered: {output_path} (fpdf, {elapsed}ms)")
 
+    limit = (preset.get("qa") or {}).get("max_pages")
+    note = f" (preset limit: {limit})" if isinstance(limit, int) else ""
+    print(f"Estimated page count: {pages}{note}")
+    if isinstance(limit, int) and pages > limit:
+        print(f"Warning: draft runs {pages} pages, over the {limit}-page limit.", file=sys.stderr)
+    return {"render": elapsed, "total": elapsed, "pages": pages}
 
-def run_qa(pdf_path: Path) -> dict:
+
+def run_qa(pdf_path: Path, in_process: bool = True, html_result: dict | None = None) -> QAResult:
     """
-    Run QA validation. Delegates to validate.py.
-    Returns dict with 'status' (PASS/FAIL) and 'issues' list.
+    Run QA validation. Calls validate.py's validate_report() in-process,
+    falling back to running validate.py as a subprocess if that fails.
+    html_result, when given, stands in for re-checking the HTML twin.
     """
+    if in_process:
+        try:
+            return validate_report(pdf_path, html_result=html_result)
+        except Exception as e:
+            print(f"Warning: in-process QA failed ({e}); retrying via subprocess.", file=sys.stderr)
+
     result = subprocess.run(
         [sys.executable, str(PROJECT_ROOT / "src" / "validate.py"), str(pdf_path)],
         capture_output=True,
@@ -174,70 +481,274 @@ def run_qa(pdf_path: Path) -> dict:
     )
 
     try:
-        return json.loads(result.stdout)
+        return QAResult.from_dict(json.loads(result.stdout))
     except (json.JSONDecodeError, ValueError):
-        return {
-            "status": "FAIL",
-            "issues": [f"QA script error: {result.stderr or result.stdout}"],
-        }
+        return QAResult(
+            status="FAIL",
+            issues=[f"QA script error: {result.stderr or result.stdout}"],
+        )
+
+
+def load_batch_manifest(manifest_path: Path) -> dict:
+    """Load and check a batch manifest. Exits on a malformed manifest."""
+    if not manifest_path.exists():
+        print(f"Error: Batch manifest not found: {manifest_path}", file=sys.stderr)
+        sys.exit(1)
+    if yaml is None:
+        print("Error: PyYAML is required for --batch manifests.", file=sys.stderr)
+        sys.exit(1)
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = yaml.safe_load(f) or {}
+
+    jobs = manifest.get("jobs")
+    if not isinstance(jobs, list) or not jobs:
+        print(f"Error: Batch manifest has no 'jobs' list: {manifest_path}", file=sys.stderr)
+        sys.exit(1)
+    for n, job in enumerate(jobs, 1):
+        if not isinstance(job, dict):
+            job = {}
+        # A job renders existing HTML, or renders a template with JSON data first
+        required = ("data", "template", "output") if job.get("template") or job.get("data") else ("html", "output")
+        missing = [key for key in required if not job.get(key)]
+        if missing:
+            print(f"Error: Batch job {n} is missing {', '.join(missing)}", file=sys.stderr)
+            sys.exit(1)
+    return manifest
+
+
+def render_job_html(job: dict, html_path: Path, strict: bool) -> str | None:
+    """Render a batch job's template + data to html_path. Returns an error message, or None."""
+    if jinja2 is None:
+        return "Jinja2 is required to render templates"
+    data_path = PROJECT_ROOT / job["data"]
+    try:
+        data = json.loads(data_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        return f"Bad data file {data_path}: {e}"
+    try:
+        render_template(job["template"], data, html_path, strict=strict)
+    except jinja2.TemplateNotFound:
+        return f"Template not found: {template_file(job['template'])}"
+    except jinja2.TemplateError as e:
+        return f"Template error: {e}"
+    return None
+
+
+def run_batch_job(
+    job: dict,
+    worker: RenderWorker,
+    wait: str,
+    cache: RenderCache | None,
+    strict: bool = False,
+    assets: bool = True,
+) -> dict:
+    """Render one manifest job. Never raises; failures land in the record."""
+    preset_name = job.get("preset", "consultant-report")
+    output_path = PROJECT_ROOT / job["output"]
+    html_path = PROJECT_ROOT / job["html"] if job.get("html") else output_path.with_suffix(".html")
+    record = {
+        "html": job.get("html") or Path(job["output"]).with_suffix(".html").as_posix(),
+        "preset": preset_name,
+        "output": job["output"],
+        "status": "failed",
+    }
+    if job.get("template"):
+        record["template"] = job["template"]
+        record["data"] = job["data"]
+    started = time.perf_counter()
+
+    error = render_job_html(job, html_path, strict) if job.get("template") else None
+    if error:
+        record["error"] = error
+    elif not html_path.exists():
+        record["error"] = f"HTML not found: {html_path}"
+    elif not get_preset_path(preset_name).exists():
+        record["error"] = f"Preset not found: {preset_name}"
+    else:
+        timings = render_pdf_playwright(
+            html_path, output_path, worker=worker, wait=wait, cache=cache, assets=assets
+        )
+        if timings is None:
+            record["error"] = "render failed (see stderr)"
+        else:
+            record["status"] = "ok"
+            record["timings"] = timings
+
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+    return record
+
+
+def run_batch(
+    manifest_path: Path,
+    workers: int | None,
+    wait: str,
+    summary_path: Path | None,
+    cache: RenderCache | None = None,
+    strict: bool = False,
+    assets: bool = True,
+) -> dict:
+    """
+    Render every job in a batch manifest concurrently across one shared
+    browser, with at most `workers` renders in flight. Writes a JSON summary
+    with per-job status and timings and returns it.
+    """
+    manifest = load_batch_manifest(manifest_path)
+    jobs = manifest["jobs"]
+    workers = max(1, workers or manifest.get("workers") or RENDER_PAGES)
+    if summary_path is None:
+        summary_path = PROJECT_ROOT / manifest.get("summary", "output/batch-summary.json")
+
+    print(f"Batch: {len(jobs)} jobs, {workers} workers")
+    started = time.perf_counter()
+    # Started lazily by the first cache miss, so a fully cached batch never launches Chromium
+    worker = RenderWorker(pages=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda job: run_batch_job(job, worker, wait, cache, strict, assets), jobs))
+    finally:
+        worker.close()
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    summary = {
+        "manifest": str(manifest_path),
+        "workers": workers,
+        "jobs": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000),
+        "results": results,
+    }
+
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"\nBatch done: {summary['succeeded']}/{summary['jobs']} succeeded in {summary['elapsed_ms']}ms")
+    print(f"Summary: {summary_path}")
+    return summary
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate PDF report from structured data")
-    parser.add_argument("--data", required=True, help="Path to JSON data file (relative to project root)")
-    parser.add_argument("--template", required=True, help="Template name (e.g., 'report')")
+    parser.add_argument("--data", help="Path to JSON data file (relative to project root)")
+    parser.add_argument("--template", help="Template name (e.g., 'report')")
     parser.add_argument("--output", help="Output PDF path (relative to project root)")
     parser.add_argument("--preview", action="store_true", help="Generate HTML preview only, skip PDF")
     parser.add_argument("--iterate", action="store_true", help="Run full QA loop (max 3 iterations)")
     parser.add_argument("--preset", default="consultant-report", help="Report type preset (default: consultant-report)")
+    parser.add_argument("--wait", choices=["ready", "fixed"], default=RENDER_WAIT,
+                        help="Page readiness mode before printing (default: ready)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-render; skip the PDF render cache")
+    parser.add_argument("--no-assets", action="store_true",
+                        help="Print the HTML as-is: no font vendoring/subsetting or image downscaling")
+    parser.add_argument("--chunks", type=int, default=1,
+                        help="Print long reports as N page ranges in parallel browser pages "
+                             "(0 = one per CPU core; default: 1, a single pass)")
+    parser.add_argument("--batch", help="Render every job in a YAML manifest (relative to project root)")
+    parser.add_argument("--workers", type=int, help="Concurrent renders in --batch mode (default: manifest or 2)")
+    parser.add_argument("--summary", help="Batch summary JSON path (default: output/batch-summary.json)")
+    parser.add_argument("--strict-undefined", action="store_true",
+                        help="Fail when the template uses a variable missing from the data")
+    parser.add_argument("--renderer", choices=["playwright", "fpdf"], default="playwright",
+                        help="PDF engine: Chromium via Playwright, or the fast browser-free fpdf draft renderer")
+    parser.add_argument("--markdown", default=DEFAULT_MARKDOWN,
+                        help=f"Markdown content for --renderer fpdf (default: {DEFAULT_MARKDOWN})")
 
     args = parser.parse_args()
+    cache = None if args.no_cache else RenderCache()
+
+    if args.batch:
+        summary = run_batch(
+            PROJECT_ROOT / args.batch,
+            args.workers,
+            args.wait,
+            PROJECT_ROOT / args.summary if args.summary else None,
+            cache=cache,
+            strict=args.strict_undefined,
+            assets=not args.no_assets,
+        )
+        sys.exit(1 if summary["failed"] else 0)
+
+    if args.renderer == "playwright" and (not args.data or not args.template):
+        parser.error("--data and --template are required (unless using --batch or --renderer fpdf)")
+    if args.renderer == "fpdf" and args.preview:
+        parser.error("--preview builds the HTML; it does not apply to --renderer fpdf")
 
     # Load preset
     preset = load_preset(args.preset)
     print(f"Preset loaded: {preset.get('name', args.preset)}")
 
-    # Load and validate data
-    data = load_data(args.data)
-    file_count = len(data.get("_files", [])) if "_files" in data else len(data)
-    print(f"Data loaded: {file_count} items")
+    if args.renderer == "playwright":
+        # Load and validate data
+        data = load_data(args.data)
+        file_count = len(data.get("_files", [])) if "_files" in data else len(data)
+        print(f"Data loaded: {file_count} items")
 
-    # Generate HTML
-    html_path = generate_html(args.data, args.template)
+        # Generate HTML
+        html_path = generate_html(args.data, args.template, data=data, strict=args.strict_undefined)
 
-    if args.preview:
-        print(f"\nPreview ready: {html_path}")
-        print("Open in a browser to review before PDF rendering.")
-        return
+        if args.preview:
+            print(f"\nPreview ready: {html_path}")
+            print("Open in a browser to review before PDF rendering.")
+            return
 
     if not args.output:
         print("Error: --output is required for PDF generation (or use --preview)", file=sys.stderr)
         sys.exit(1)
 
     output_path = PROJECT_ROOT / args.output
+    chunks = args.chunks or os.cpu_count() or 1
+    if chunks > 1 and args.renderer == "playwright":
+        # The shared worker needs a browser page per concurrent chunk
+        get_render_worker(pages=max(RENDER_PAGES, chunks))
 
     # Render PDF
-    success = render_pdf_playwright(html_path, output_path)
-    if not success:
+    if args.renderer == "fpdf":
+        timings = render_pdf_fpdf(PROJECT_ROOT / args.markdown, output_path, args.preset, preset)
+    else:
+        timings = render_pdf_playwright(
+            html_path, output_path, wait=args.wait, cache=cache, chunks=chunks, assets=not args.no_assets
+        )
+    if timings is None:
         sys.exit(1)
 
     if args.iterate:
+        # With templated JSON data, rounds after the first pick up edits to
+        # the data and re-render/re-scan only the sections that changed
+        report = None
+        if args.renderer == "playwright" and "_data_dir" not in data:
+            report = get_incremental_report(args.template, args.strict_undefined)
         max_iterations = 3
         for i in range(max_iterations):
             print(f"\n--- QA Iteration {i + 1}/{max_iterations} ---")
-            qa_result = run_qa(output_path)
-
-            if qa_result["status"] == "PASS":
+            if report is not None and i > 0:
+                previous_html = report.html
+                data = load_data(args.data)
+                html_path = generate_html(args.data, args.template, data=data, strict=args.strict_undefined)
+                if report.html != previous_html:
+                    timings = render_pdf_playwright(
+                        html_path, output_path, wait=args.wait, cache=cache,
+                        chunks=chunks, assets=not args.no_assets,
+                    )
+                    if timings is None:
+                        sys.exit(1)
+
+            # The HTML twin's checklist comes from cached per-section stats
+            html_result = None
+            if report is not None and html_path == output_path.with_suffix(".html"):
+                html_result = report.qa()
+            qa_result = run_qa(output_path, html_result=html_result)
+
+            if qa_result.status == "PASS":
                 print("QA PASSED. Report is ready.")
                 return
-            elif qa_result["status"] == "PASS WITH NOTES":
+            elif qa_result.status == "PASS WITH NOTES":
                 print("QA PASSED WITH NOTES:")
-                for note in qa_result.get("notes", []):
+                for note in qa_result.notes:
                     print(f"  - {note}")
                 return
             else:
-                print(f"QA FAILED ({len(qa_result.get('issues', []))} issues):")
-                for issue in qa_result.get("issues", []):
+                print(f"QA FAILED ({len(qa_result.issues)} issues):")
+                for issue in qa_result.issues:
                     print(f"  - {issue}")
 
                 if i < max_iterations - 1:
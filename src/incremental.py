@@ -0,0 +1,188 @@
+"""
+Incremental Report Rendering
+
+Renders a templated report section by section, so re-rendering after an
+edit costs only the sections that changed. Each entry of the data's
+`sections` / `appendices` lists is rendered on its own through its partial
+(templates/partials/) and fingerprinted by its data and the partial's
+source. The rendered fragment and its QA scan (validate.HtmlStats) are
+cached, so unchanged sections are neither re-rendered nor re-scanned, and
+document-level QA is recomputed by merging per-piece stats.
+
+The page template places pre-rendered fragments through
+`section.rendered_html` (see templates/report.html); a template that does
+not is still rendered correctly, just without the savings.
+
+Entries live in .cache/sections/<key>.json. An entry's mtime is its last
+use; the least recently used entries are evicted beyond MAX_ENTRIES.
+
+Usage:
+    from incremental import IncrementalReport
+    report = IncrementalReport(env, "report.html")
+    counts = report.render(data, Path("output/report.html"))
+    html_result = report.qa()
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from render_cache import atomic_write, evict_lru
+from validate import HtmlStats, analyze_html, check_html, merge_html_stats
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "sections"
+
+# Bump to invalidate every entry when the key recipe or entry format changes
+CACHE_VERSION = "2"
+
+MAX_ENTRIES = 5000
+
+# Data lists rendered piecewise, and the partial each entry goes through
+PARTIALS = {
+    "sections": "partials/section.html",
+    "appendices": "partials/appendix.html",
+}
+
+# Key the page template reads a pre-rendered fragment from
+RENDERED_KEY = "rendered_html"
+
+# Placeholder the page template emits in place of fragment n; NUL never
+# occurs in rendered HTML, so splitting on it cannot hit real content
+FRAGMENT_MARK = "\x00{}\x00"
+FRAGMENT_RE = re.compile("\x00(\\d+)\x00")
+
+
+class FragmentCache:
+    """Rendered section fragments and their QA stats, in memory and on disk."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memory: dict[str, tuple[str, HtmlStats]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> tuple[str, HtmlStats] | None:
+        hit = self._memory.get(key)
+        if hit is not None:
+            return hit
+        entry = self._entry(key)
+        try:
+            record = json.loads(entry.read_text(encoding="utf-8"))
+            hit = (record["html"], HtmlStats.from_dict(record["stats"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        os.utime(entry)  # mark as most recently used
+        self._memory[key] = hit
+        return hit
+
+    def put(self, key: str, html: str, stats: HtmlStats) -> None:
+        self._memory[key] = (html, stats)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self._entry(key)) as tmp:
+            tmp.write_text(json.dumps({"html": html, "stats": stats.to_dict()}), encoding="utf-8")
+
+    def evict(self) -> int:
+        """Drop least recently used entries beyond the budget. Returns count removed."""
+        with self._lock:
+            removed = evict_lru(self.cache_dir, "*.json", self.max_entries)
+            for path in removed:
+                self._memory.pop(path.stem, None)
+            return len(removed)
+
+
+class IncrementalReport:
+    """
+    One page template rendered repeatedly (e.g. across --iterate rounds),
+    re-rendering and re-scanning only the sections whose data changed.
+    """
+
+    def __init__(self, env, template_name: str, cache: FragmentCache | None = None):
+        self.env = env
+        self.template_name = template_name
+        self.cache = cache or FragmentCache()
+        self.html = ""
+        # Stats of the last render's pieces (page text and fragments) in document order
+        self._pieces: list[HtmlStats] = []
+        # page text between fragments -> stats; the skeleton rarely changes
+        self._skeleton_stats: dict[str, HtmlStats] = {}
+
+    def _partial_digest(self, partial_name: str) -> str:
+        source, _, _ = self.env.loader.get_source(self.env, partial_name)
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def fingerprint(self, partial_digest: str, item: dict) -> str:
+        """Hash of one section's data, its partial and the environment's undefined handling."""
+        h = hashlib.sha256()
+        h.update(f"v{CACHE_VERSION}\n{partial_digest}\n{self.env.undefined.__name__}\n".encode())
+        h.update(json.dumps(item, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def render(self, data: dict, output_path: Path) -> dict:
+        """
+        Render the report to output_path. Returns counts of fragments
+        rendered and reused, and whether the written HTML changed.
+        Raises jinja2 errors (missing template, syntax, strict undefined).
+        """
+        context = dict(data)
+        fragments: list[tuple[str, HtmlStats]] = []
+        rendered = 0
+        for list_key, partial_name in PARTIALS.items():
+            items = data.get(list_key)
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                continue
+            partial = None
+            digest = self._partial_digest(partial_name) if items else ""
+            placed = []
+            for item in items:
+                key = self.fingerprint(digest, item)
+                hit = self.cache.get(key)
+                if hit is None:
+                    if partial is None:
+                        partial = self.env.get_template(partial_name)
+                    html = partial.render(section=item)
+                    hit = (html, analyze_html(html))
+                    self.cache.put(key, *hit)
+                    rendered += 1
+                placed.append({**item, RENDERED_KEY: FRAGMENT_MARK.format(len(fragments))})
+                fragments.append(hit)
+            context[list_key] = placed
+
+        skeleton = self.env.get_template(self.template_name).render(**context)
+
+        # Split parts alternate page text and fragment index: text, n, text, n, ..., text
+        parts = FRAGMENT_RE.split(skeleton)
+        html_parts: list[str] = []
+        pieces: list[HtmlStats] = []
+        skeleton_stats: dict[str, HtmlStats] = {}
+        for n, part in enumerate(parts):
+            if n % 2:
+                html, stats = fragments[int(part)]
+            else:
+                html = part
+                stats = self._skeleton_stats.get(part) or analyze_html(part)
+                skeleton_stats[part] = stats
+            html_parts.append(html)
+            pieces.append(stats)
+        self._skeleton_stats = skeleton_stats
+        self._pieces = pieces
+
+        html = "".join(html_parts)
+        changed = html != self.html or not output_path.exists()
+        if changed:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(html, encoding="utf-8")
+        self.html = html
+        if rendered:
+            self.cache.evict()
+        return {"fragments": len(fragments), "rendered": rendered, "reused": len(fragments) - rendered, "changed": changed}
+
+    def qa(self) -> dict:
+        """The HTML checklist for the last render, from cached per-piece stats."""
+        return check_html(merge_html_stats(self._pieces))
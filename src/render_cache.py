@@ -0,0 +1,183 @@
+"""
+Render Cache
+
+Content-addressed cache of rendered PDFs. The key hashes the HTML, every local
+stylesheet/image/font it references (following url() and @import through
+CSS), and the render options, so re-rendering an unchanged report is a file
+copy instead of a Chromium run. Outputs are independent copies, never links
+into the cache, so tools that rewrite a PDF in place cannot corrupt an entry.
+
+Entries live in .cache/render/<key>.pdf. An entry's mtime is its last use;
+the least recently used entries are evicted once the cache exceeds its size
+or entry budget. The atomic writer and LRU eviction are shared with the
+other on-disk caches (incremental.py, assets.py, extraction.py).
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / ".cache" / "render"
+
+# Bump to invalidate every entry when the key recipe changes
+CACHE_VERSION = "1"
+
+MAX_BYTES = 512 * 1024 * 1024
+MAX_ENTRIES = 200
+
+HTML_REF_RE = re.compile(r"""\b(?:href|src)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+CSS_REF_RE = re.compile(r"""url\(\s*["']?([^"')]+?)["']?\s*\)|@import\s+["']([^"']+)["']""", re.IGNORECASE)
+
+REMOTE_PREFIXES = ("http:", "https:", "data:", "mailto:", "javascript:", "//", "#")
+
+
+def resolve_local_ref(ref: str, base_dir: Path, serve_root: Path = PROJECT_ROOT) -> Path | None:
+    """
+    Resolve an href/src/url() reference to a local file the way the render
+    server would see it. Returns None for remote, inline or missing targets.
+    """
+    ref = ref.strip().split("#", 1)[0].split("?", 1)[0]
+    if not ref or ref.lower().startswith(REMOTE_PREFIXES):
+        return None
+    path = serve_root / ref.lstrip("/") if ref.startswith("/") else base_dir / ref
+    path = path.resolve()
+    return path if path.is_file() else None
+
+
+@contextmanager
+def atomic_write(path: Path):
+    """
+    Yield a temporary sibling of `path` to write to; it replaces `path` once
+    the block completes, so concurrent readers never see a partial file.
+    The name carries the process and thread ids, so writers in a process
+    pool never share a temporary file.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def evict_lru(cache_dir: Path, pattern: str, max_entries: int, max_bytes: int | None = None) -> list[Path]:
+    """
+    Delete the least recently used files matching `pattern` in cache_dir
+    beyond max_entries or (when given) max_bytes. A file's mtime is its
+    last use; callers touch entries on every hit. Returns the removed paths.
+    """
+    entries = []
+    for path in cache_dir.glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort(reverse=True)  # newest first
+
+    kept_bytes = 0
+    removed = []
+    for n, (_, size, path) in enumerate(entries):
+        kept_bytes += size
+        if n >= max_entries or (max_bytes is not None and kept_bytes > max_bytes):
+            path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
+
+
+class FileDigests:
+    """sha256 of files, memoized by (path, mtime_ns, size) so unchanged files are hashed once."""
+
+    def __init__(self):
+        self._digests: dict[tuple[str, int, int], str] = {}
+
+    def __call__(self, path: Path) -> str:
+        stat = path.stat()
+        memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            self._digests[memo_key] = digest
+        return digest
+
+
+class RenderCache:
+    """Content-addressed PDF cache with LRU, size-bounded eviction."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = MAX_BYTES, max_entries: int = MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Batch runs hash shared CSS once
+        self._digest = FileDigests()
+
+    def collect_assets(self, html_path: Path) -> list[Path]:
+        """Every local file the HTML pulls in, in a stable order."""
+        html_path = html_path.resolve()
+        found: dict[Path, None] = {}
+        pending = [
+            (ref, html_path.parent)
+            for ref in HTML_REF_RE.findall(html_path.read_text(encoding="utf-8"))
+        ]
+        while pending:
+            ref, base_dir = pending.pop(0)
+            path = resolve_local_ref(ref, base_dir)
+            if path is None or path in found or path == html_path:
+                continue
+            found[path] = None
+            if path.suffix.lower() == ".css":
+                css = path.read_text(encoding="utf-8", errors="replace")
+                for url_ref, import_ref in CSS_REF_RE.findall(css):
+                    pending.append((url_ref or import_ref, path.parent))
+        return list(found)
+
+    def key(self, html_path: Path, options: dict) -> str:
+        """Hash of the HTML, its local assets and the render options."""
+        h = hashlib.sha256()
+        h.update(f"v{CACHE_VERSION}\n".encode())
+        h.update(json.dumps(options, sort_keys=True).encode())
+        h.update(b"\nhtml:" + self._digest(html_path.resolve()).encode())
+        for asset in self.collect_assets(html_path):
+            try:
+                name = asset.relative_to(PROJECT_ROOT).as_posix()
+            except ValueError:
+                name = asset.as_posix()
+            h.update(f"\n{name}:{self._digest(asset)}".encode())
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """On a hit, copy the cached PDF to output_path (atomically replacing it)."""
+        entry = self._entry(key)
+        with self._lock:
+            if not entry.exists():
+                return False
+            os.utime(entry)  # mark as most recently used
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with atomic_write(output_path) as tmp:
+                shutil.copyfile(entry, tmp)
+        except FileNotFoundError:
+            return False  # evicted between the check and the copy
+        return True
+
+    def store(self, key: str, pdf_path: Path) -> None:
+        """Copy a freshly rendered PDF into the cache, then evict."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self._entry(key)) as tmp:
+            shutil.copyfile(pdf_path, tmp)
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries beyond the budgets. Returns count removed."""
+        with self._lock:
+            return len(evict_lru(self.cache_dir, "*.pdf", self.max_entries, self.max_bytes))
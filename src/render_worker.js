@@ -0,0 +1,259 @@
+/**
+ * Persistent Playwright render worker.
+ *
+ * Keeps one Chromium instance warm and renders PDF jobs received as JSON
+ * lines on stdin, replying with one JSON line per job on stdout. Pages are
+ * pooled and reused across jobs; if Chromium crashes it is relaunched on the
+ * next job.
+ *
+ * Usage:
+ *     node src/render_worker.js [--pages N]
+ *
+ * Job:      {"id": 1, "url": "http://...", "path": "out.pdf", "pdf": {...},
+ *            "wait": "ready" | "fixed", "readyTimeout": 10000, "timeout": 60000}
+ * Reply:    {"id": 1, "ok": true, "ms": 812, "timings": {"goto": 95, ...}}
+ * Cancel:   {"op": "cancel", "id": 1}
+ * Shutdown: {"op": "shutdown"}
+ *
+ * "timeout" bounds the whole job from the moment it is received (queueing
+ * for a page included). A job that runs out of time or is cancelled fails
+ * and never writes its output: the PDF is generated to memory and written
+ * only if the job is still live.
+ *
+ * "ready" (default) waits for document.fonts.ready, image decode and an
+ * optional window.reportReady promise, bounded by readyTimeout. "fixed"
+ * keeps the old networkidle + 3s settle.
+ */
+const fs = require('fs');
+const { chromium } = require('playwright');
+const readline = require('readline');
+
+const pagesArg = process.argv.indexOf('--pages');
+const POOL_SIZE = Math.max(1, parseInt(pagesArg > -1 ? process.argv[pagesArg + 1] : '2', 10) || 2);
+const DEFAULT_TIMEOUT_MS = 60000;
+
+let browser = null;
+let launching = null;
+let freePages = [];
+let active = 0;
+const waiting = [];
+// Job id -> {deadline, timeoutMs, cancelled, page} for jobs in flight
+const jobs = new Map();
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+async function getBrowser() {
+    if (browser && browser.isConnected()) return browser;
+    if (!launching) {
+        launching = chromium.launch().then((b) => {
+            browser = b;
+            freePages = [];
+            b.on('disconnected', () => {
+                if (browser === b) {
+                    browser = null;
+                    freePages = [];
+                }
+            });
+            launching = null;
+            return b;
+        }, (err) => {
+            launching = null;
+            throw err;
+        });
+    }
+    return launching;
+}
+
+// Bounded page pool: at most POOL_SIZE jobs hold a page at once.
+function acquireSlot() {
+    if (active < POOL_SIZE) {
+        active++;
+        return Promise.resolve();
+    }
+    return new Promise((resolve) => waiting.push(resolve));
+}
+
+function releaseSlot() {
+    const next = waiting.shift();
+    if (next) next();
+    else active--;
+}
+
+async function checkoutPage() {
+    const b = await getBrowser();
+    while (freePages.length) {
+        const page = freePages.pop();
+        if (!page.isClosed()) return page;
+    }
+    return b.newPage();
+}
+
+function withDeadline(promise, deadline, onExpire) {
+    const remaining = deadline - Date.now();
+    let timer;
+    const expired = new Promise((resolve, reject) => {
+        timer = setTimeout(() => reject(onExpire()), Math.max(0, remaining));
+    });
+    return Promise.race([promise, expired]).finally(() => clearTimeout(timer));
+}
+
+class ReadyTimeout extends Error {
+    constructor(phase) {
+        super(`readiness timed out waiting for ${phase}`);
+        this.phase = phase;
+    }
+}
+
+// In-page readiness probes, run in order against one shared deadline
+const READY_PHASES = [
+    ['fonts', () => document.fonts.ready.then(() => document.fonts.size)],
+    ['images', () => Promise.all(Array.from(document.images, (img) => (
+        img.complete
+            ? img.decode().catch(() => {})
+            : new Promise((resolve) => {
+                img.addEventListener('load', resolve, { once: true });
+                img.addEventListener('error', resolve, { once: true });
+            }).then(() => img.decode().catch(() => {}))
+    ))).then((decoded) => decoded.length)],
+    // Optional page-defined signal: window.reportReady = <Promise>
+    ['signal', () => (window.reportReady && typeof window.reportReady.then === 'function'
+        ? Promise.resolve(window.reportReady).then(() => true)
+        : false)],
+];
+
+async function waitForReady(page, timeoutMs, timings) {
+    const deadline = Date.now() + timeoutMs;
+    try {
+        for (const [phase, probe] of READY_PHASES) {
+            const started = Date.now();
+            await withDeadline(page.evaluate(probe), deadline, () => new ReadyTimeout(phase));
+            timings[phase] = Date.now() - started;
+        }
+    } catch (err) {
+        if (!(err instanceof ReadyTimeout)) throw err;
+        // Hard timeout: render what we have rather than failing the job
+        timings.readyTimedOut = err.phase;
+    }
+}
+
+// Milliseconds the job has left; throws once it is cancelled or out of time
+function remaining(state) {
+    if (state.cancelled) throw new Error('render cancelled');
+    const ms = state.deadline - Date.now();
+    if (ms <= 0) throw jobTimeout(state);
+    return ms;
+}
+
+function jobTimeout(state) {
+    return new Error(`render timed out after ${state.timeoutMs}ms`);
+}
+
+async function renderOnce(job, state) {
+    const timings = {};
+    const mark = (phase, started) => { timings[phase] = Date.now() - started; };
+    let page = await checkoutPage();
+    state.page = page;
+    try {
+        let started = Date.now();
+        if (job.wait === 'fixed') {
+            await page.goto(job.url, { waitUntil: 'networkidle', timeout: remaining(state) });
+            mark('goto', started);
+
+            // Legacy fixed settle for remote Google Fonts
+            started = Date.now();
+            const settle = job.settleMs === undefined ? 3000 : job.settleMs;
+            await page.waitForTimeout(Math.min(settle, remaining(state)));
+            mark('settle', started);
+        } else {
+            await page.goto(job.url, { waitUntil: 'load', timeout: remaining(state) });
+            mark('goto', started);
+            await waitForReady(page, Math.min(job.readyTimeout || 10000, remaining(state)), timings);
+        }
+
+        started = Date.now();
+        const pdf = await withDeadline(page.pdf(job.pdf), state.deadline, () => jobTimeout(state));
+        // Synchronous check-and-write: a cancel cannot land in between
+        remaining(state);
+        fs.writeFileSync(job.path, pdf);
+        mark('pdf', started);
+
+        freePages.push(page);
+        page = null;
+        return timings;
+    } finally {
+        state.page = null;
+        if (page) await page.close().catch(() => {});
+    }
+}
+
+async function render(job) {
+    const timeoutMs = job.timeout || DEFAULT_TIMEOUT_MS;
+    const state = { deadline: Date.now() + timeoutMs, timeoutMs, cancelled: false, page: null };
+    jobs.set(job.id, state);
+    await acquireSlot();
+    const started = Date.now();
+    try {
+        let timings;
+        try {
+            remaining(state);
+            timings = await renderOnce(job, state);
+        } catch (err) {
+            // Retry once on a fresh browser if Chromium went away mid-job
+            if ((browser && browser.isConnected()) || state.cancelled) throw err;
+            timings = await renderOnce(job, state);
+        }
+        send({ id: job.id, ok: true, ms: Date.now() - started, timings });
+    } catch (err) {
+        send({ id: job.id, ok: false, error: String((err && err.message) || err) });
+    } finally {
+        jobs.delete(job.id);
+        releaseSlot();
+    }
+}
+
+function cancel(id) {
+    const state = jobs.get(id);
+    if (!state) return;
+    state.cancelled = true;
+    // Closing the page aborts whatever navigation or print is in progress
+    if (state.page) state.page.close().catch(() => {});
+}
+
+async function shutdown() {
+    if (browser) await browser.close().catch(() => {});
+    process.exit(0);
+}
+
+(async () => {
+    try {
+        await getBrowser();
+    } catch (err) {
+        process.stderr.write(`Chromium launch failed: ${(err && err.message) || err}\n`);
+        process.exit(1);
+    }
+    send({ event: 'ready', pages: POOL_SIZE });
+
+    const rl = readline.createInterface({ input: process.stdin });
+    rl.on('line', (line) => {
+        if (!line.trim()) return;
+        let job;
+        try {
+            job = JSON.parse(line);
+        } catch (err) {
+            process.stderr.write(`Bad job line: ${line}\n`);
+            return;
+        }
+        if (job.op === 'shutdown') {
+            shutdown();
+            return;
+        }
+        if (job.op === 'cancel') {
+            cancel(job.id);
+            return;
+        }
+        render(job);
+    });
+    rl.on('close', shutdown);
+})();
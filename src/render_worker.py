@@ -0,0 +1,179 @@
+"""
+Render Worker Client
+
+Drives a long-lived `node src/render_worker.js` process that keeps a warm
+Chromium instance, so a run of several PDFs pays the browser startup cost once.
+Jobs and replies are JSON lines over the worker's stdin/stdout.
+
+Usage:
+    with RenderWorker(pages=4) as worker:
+        worker.render(url, output_path, {"format": "Letter"})
+"""
+
+import collections
+import itertools
+import json
+import subprocess
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+WORKER_SCRIPT = PROJECT_ROOT / "src" / "render_worker.js"
+
+# Extra wait past a job's timeout for the worker's own timeout reply
+# before giving up on it and cancelling the job
+REPLY_GRACE = 5
+
+
+class RenderWorkerError(RuntimeError):
+    """Raised when the render worker cannot start or a job fails."""
+
+
+class RenderWorker:
+    """Thread-safe client for the persistent Node render worker."""
+
+    def __init__(self, pages: int = 2, startup_timeout: float = 60):
+        self.pages = pages
+        self.startup_timeout = startup_timeout
+        self._proc: subprocess.Popen | None = None
+        self._pending: dict[int, tuple[subprocess.Popen, Future]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stderr: collections.deque[str] = collections.deque(maxlen=50)
+        self._ready: Future | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """Spawn the worker (if not already running) and wait for Chromium."""
+        with self._lock:
+            if self.alive:
+                return
+            self._stderr.clear()
+            self._ready = Future()
+            # Raises FileNotFoundError if Node.js is not installed
+            proc = subprocess.Popen(
+                ["node", str(WORKER_SCRIPT), "--pages", str(self.pages)],
+                cwd=str(PROJECT_ROOT),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+            self._proc = proc
+            threading.Thread(target=self._read_stdout, args=(proc, self._ready), daemon=True).start()
+            threading.Thread(target=self._read_stderr, args=(proc,), daemon=True).start()
+            ready = self._ready
+
+        try:
+            ready.result(timeout=self.startup_timeout)
+        except FutureTimeout:
+            self.close()
+            raise RenderWorkerError(f"Render worker did not start within {self.startup_timeout}s")
+
+    def render(self, url: str, output_path: Path, pdf_options: dict, timeout: float = 60, **job) -> dict:
+        """
+        Render `url` to `output_path`. Blocks until the worker replies.
+        Restarts the worker once if it has died since the last job.
+        Returns the worker's reply dict (includes 'ms').
+
+        `timeout` (seconds) bounds the whole job inside the worker, which
+        fails it and writes nothing once it runs out. Should the reply still
+        not arrive, the job is cancelled so it cannot write output_path
+        after this call has raised.
+        """
+        if not self.alive:
+            self.start()
+
+        job_id = next(self._ids)
+        future: Future = Future()
+        message = {
+            "id": job_id,
+            "url": url,
+            "path": Path(output_path).as_posix(),
+            "pdf": pdf_options,
+            "timeout": round(timeout * 1000),
+            **job,
+        }
+        with self._lock:
+            self._pending[job_id] = (self._proc, future)
+            try:
+                self._proc.stdin.write(json.dumps(message) + "\n")
+                self._proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._pending.pop(job_id, None)
+                raise RenderWorkerError(f"Render worker is not accepting jobs: {e}")
+
+        try:
+            reply = future.result(timeout=timeout + REPLY_GRACE)
+        except FutureTimeout:
+            with self._lock:
+                proc = self._pending.pop(job_id, (None, None))[0]
+                if proc is not None and proc.poll() is None:
+                    try:
+                        proc.stdin.write(json.dumps({"op": "cancel", "id": job_id}) + "\n")
+                        proc.stdin.flush()
+                    except (OSError, ValueError):
+                        pass
+            raise RenderWorkerError(f"PDF render timed out after {timeout}s")
+
+        if not reply.get("ok"):
+            raise RenderWorkerError(reply.get("error", "unknown render error"))
+        return reply
+
+    def close(self) -> None:
+        """Ask the worker to shut down Chromium and exit."""
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+            proc.stdin.close()
+            proc.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            proc.kill()
+
+    def _read_stdout(self, proc: subprocess.Popen, ready: Future) -> None:
+        for line in proc.stdout:
+            try:
+                reply = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if reply.get("event") == "ready":
+                ready.set_result(reply)
+                continue
+            with self._lock:
+                entry = self._pending.pop(reply.get("id"), None)
+            if entry is not None:
+                entry[1].set_result(reply)
+
+        # Worker exited: fail whatever was still in flight
+        proc.wait()
+        error = RenderWorkerError(
+            f"Render worker exited (code {proc.returncode}): {''.join(self._stderr).strip()}"
+        )
+        if not ready.done():
+            ready.set_exception(error)
+        with self._lock:
+            pending = [job_id for job_id, (owner, _) in self._pending.items() if owner is proc]
+            futures = [self._pending.pop(job_id)[1] for job_id in pending]
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _read_stderr(self, proc: subprocess.Popen) -> None:
+        for line in proc.stderr:
+            self._stderr.append(line)
@@ -0,0 +1,313 @@
+"""
+Source Index
+
+Persistent full-text index over the paragraphs of the source corpus, so
+agents can pull supporting evidence with a ranked query instead of scanning
+raw text dumps. Backed by SQLite FTS5 (BM25 ranking) over a plain passages
+table; every passage keeps its document / page / paragraph provenance.
+
+Updates are incremental: a document is re-extracted only when its mtime or
+size changed, and documents that left the corpus are dropped.
+
+Usage:
+    python src/source_index.py --update                  # index data/
+    python src/source_index.py "margin requirements"
+    python src/source_index.py "legal finality" --limit 5 --json
+
+    from source_index import SourceIndex
+    hits = SourceIndex().search("stablecoin margin")
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from extraction import BACKENDS, DATA_DIR, backend_order, find_sources
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+INDEX_PATH = PROJECT_ROOT / ".cache" / "sources.sqlite"
+
+# PDF pages are split into passages on blank lines; text without blank
+# lines is grouped into passages of roughly this many characters
+PASSAGE_CHARS = 800
+
+# Bump when SCHEMA changes incompatibly; an older index is dropped and rebuilt
+SCHEMA_VERSION = 2
+
+# Passages live in a plain table (indexed on doc_id, so replacing one
+# document's passages does not scan the corpus); passages_fts is an
+# external-content FTS5 index over their text, kept in sync by triggers.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    backend TEXT,
+    passage_count INTEGER NOT NULL DEFAULT 0,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    page INTEGER,
+    paragraph INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_doc_id ON passages (doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+    text,
+    content = 'passages',
+    content_rowid = 'id',
+    tokenize = 'porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS passages_ai AFTER INSERT ON passages BEGIN
+    INSERT INTO passages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS passages_ad AFTER DELETE ON passages BEGIN
+    INSERT INTO passages_fts (passages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Tables of earlier schema versions (version 1 kept passages in FTS5 itself)
+OLD_TABLES = ("passages_fts", "passages", "documents")
+
+
+def split_page(text: str) -> list[str]:
+    """Split one page of PDF text into paragraph-sized passages."""
+    blocks = [b.strip() for b in re.split(r"\n\s*\n", text) if b.strip()]
+    passages: list[str] = []
+    for block in blocks:
+        if len(block) <= PASSAGE_CHARS * 2:
+            passages.append(" ".join(block.split()))
+            continue
+        # No paragraph breaks survived extraction: group lines instead
+        current: list[str] = []
+        size = 0
+        for line in block.splitlines():
+            current.append(line.strip())
+            size += len(line)
+            if size >= PASSAGE_CHARS:
+                passages.append(" ".join(" ".join(current).split()))
+                current, size = [], 0
+        if current:
+            passages.append(" ".join(" ".join(current).split()))
+    return [p for p in passages if p]
+
+
+def iter_passages(path: Path, backend_name: str) -> Iterator[tuple[int | None, int, str]]:
+    """Yield (page, paragraph, text) for a whole document. Pages are 1-based; docx has no pages."""
+    doc_type = path.suffix.lstrip(".").lower()
+    backend = BACKENDS[doc_type][backend_name]
+    if doc_type == "docx":
+        for n, paragraph in enumerate(backend.iterate(path, 0), 1):
+            yield None, n, paragraph.strip()
+        return
+    for page_no, page_text in enumerate(backend.iterate(path, sys.maxsize), 1):
+        for n, passage in enumerate(split_page(page_text), 1):
+            yield page_no, n, passage
+
+
+def extract_passages(path: str, order: list[str]) -> dict:
+    """Process-pool entry point: all passages of one document, with backend fallback."""
+    failures = []
+    for name in order:
+        try:
+            return {"path": path, "backend": name, "passages": list(iter_passages(Path(path), name))}
+        except Exception as e:
+            failures.append(f"{name}: {type(e).__name__}: {e}")
+    return {"path": path, "error": "; ".join(failures) or "no backend installed"}
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match (prefix on the last)."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return '""'
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SourceIndex:
+    """SQLite FTS5 index of source passages with document provenance."""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.row_factory = sqlite3.Row
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Derived data only: drop an outdated index and re-extract on the next update
+            with self.db:
+                for table in OLD_TABLES:
+                    self.db.execute(f"DROP TABLE IF EXISTS {table}")
+                self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, paths: list[Path], jobs: int | None = None, prune: bool = True) -> dict:
+        """
+        Bring the index in line with `paths`: (re)index new or changed
+        documents and, with `prune`, drop documents no longer present.
+        Documents are keyed by resolved path, so relative and absolute
+        spellings of the same corpus match.
+        Returns counts of added/updated/removed/unchanged/failed documents.
+        """
+        paths = [path.resolve() for path in paths]
+        known = {
+            row["path"]: row
+            for row in self.db.execute("SELECT id, path, mtime_ns, size FROM documents")
+        }
+        stale: list[Path] = []
+        unchanged = 0
+        for path in paths:
+            stat = path.stat()
+            row = known.get(str(path))
+            if row and row["mtime_ns"] == stat.st_mtime_ns and row["size"] == stat.st_size:
+                unchanged += 1
+            else:
+                stale.append(path)
+
+        orders = [backend_order(p.suffix.lstrip(".").lower()) for p in stale]
+        if len(stale) > 1 and jobs != 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                extracted = list(pool.map(extract_passages, [str(p) for p in stale], orders))
+        else:
+            extracted = [extract_passages(str(p), order) for p, order in zip(stale, orders)]
+
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": unchanged, "failed": []}
+        with self.db:
+            for path, result in zip(stale, extracted):
+                if "error" in result:
+                    counts["failed"].append(f"{path.name}: {result['error']}")
+                    continue
+                row = known.get(str(path))
+                if row:
+                    self._delete(row["id"])
+                    counts["updated"] += 1
+                else:
+                    counts["added"] += 1
+                self._insert(path, result)
+
+            if prune:
+                present = {str(p) for p in paths}
+                for doc_path, row in known.items():
+                    if doc_path not in present:
+                        self._delete(row["id"])
+                        counts["removed"] += 1
+        return counts
+
+    def _delete(self, doc_id: int) -> None:
+        self.db.execute("DELETE FROM passages WHERE doc_id = ?", (doc_id,))
+        self.db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def _insert(self, path: Path, result: dict) -> None:
+        stat = path.stat()
+        cur = self.db.execute(
+            "INSERT INTO documents (path, name, type, mtime_ns, size, backend, passage_count, indexed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(path), path.name, path.suffix.lstrip(".").lower(),
+                stat.st_mtime_ns, stat.st_size, result["backend"],
+                len(result["passages"]), time.time(),
+            ),
+        )
+        self.db.executemany(
+            "INSERT INTO passages (text, doc_id, page, paragraph) VALUES (?, ?, ?, ?)",
+            [(text, cur.lastrowid, page, n) for page, n, text in result["passages"]],
+        )
+
+    def search(self, query: str, limit: int = 10, raw: bool = False) -> list[dict]:
+        """
+        Ranked passages matching `query` (best first). Free text by
+        default; `raw` passes FTS5 query syntax through unchanged.
+        """
+        rows = self.db.execute(
+            """
+            SELECT documents.name, documents.path, passages.page, passages.paragraph,
+                   snippet(passages_fts, 0, '[', ']', '...', 16) AS snippet,
+                   bm25(passages_fts) AS score
+            FROM passages_fts
+            JOIN passages ON passages.id = passages_fts.rowid
+            JOIN documents ON documents.id = passages.doc_id
+            WHERE passages_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+            """,
+            (query if raw else fts_query(query), limit),
+        )
+        return [
+            {
+                "document": row["name"],
+                "path": row["path"],
+                "page": row["page"],
+                "paragraph": row["paragraph"],
+                "snippet": row["snippet"],
+                "score": round(-row["score"], 3),
+            }
+            for row in rows
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the source passage index")
+    parser.add_argument("query", nargs="?", help="Words to search for")
+    parser.add_argument("--update", action="store_true", help="Index new/changed documents in --data first")
+    parser.add_argument("--data", default=str(DATA_DIR), help="Source directory (default: data/)")
+    parser.add_argument("--limit", type=int, default=10, help="Max results (default: 10)")
+    parser.add_argument("--raw", action="store_true", help="Treat query as FTS5 syntax")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if not args.query and not args.update:
+        parser.error("give a query and/or --update")
+
+    with SourceIndex() as index:
+        if args.update:
+            counts = index.update(find_sources(Path(args.data)))
+            print(
+                f"Index: {counts['added']} added, {counts['updated']} updated, "
+                f"{counts['removed']} removed, {counts['unchanged']} unchanged",
+                file=sys.stderr,
+            )
+            for failure in counts["failed"]:
+                print(f"  ERROR {failure}", file=sys.stderr)
+        if not args.query:
+            return
+
+        try:
+            hits = index.search(args.query, limit=args.limit, raw=args.raw)
+        except sqlite3.OperationalError as e:
+            print(f"Error: bad query: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.json:
+        print(json.dumps(hits, indent=2, ensure_ascii=False))
+        return
+    if not hits:
+        print("No matches.")
+    for hit in hits:
+        where = f"p.{hit['page']} " if hit["page"] else ""
+        print(f"{hit['score']:>7.2f}  {hit['document']} ({where}para {hit['paragraph']})")
+        print(f"         {hit['snippet']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Building with flush_pages must bound memory, not only produce the same text.
+
+Each build runs in its own interpreter so ru_maxrss measures that build
+alone. The report is one long table streamed from a generator, so neither
+the input nor the parsed rows are held whole.
+
+Usage:
+    python -m pytest tests/test_flush_memory.py
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fpdf")
+pytest.importorskip("pypdf")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+ROWS = 9000
+FLUSH_PAGES = 20
+
+BUILD = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+import generate_report_pdf as g
+
+def source():
+    yield from ["# Long table", "", "| Name | Value | Notes |", "|---|---|---|"]
+    for i in range(int(sys.argv[3])):
+        yield f"| row {i} | {i * 3} | {'note ' * (i % 7)}{'word ' * 60} |"
+
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+pages = g.build_pdf(g.iter_blocks(source()), sys.argv[2], flush_pages=int(sys.argv[4]) or None)
+print(pages, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base)
+"""
+
+
+def build(tmp_path, flush_pages):
+    """(page count, peak RSS growth in KB) of one build in a fresh interpreter."""
+    out = tmp_path / f"flush-{flush_pages}.pdf"
+    proc = subprocess.run(
+        [sys.executable, "-c", BUILD, str(PROJECT_ROOT), str(out), str(ROWS), str(flush_pages)],
+        capture_output=True, text=True, check=True,
+    )
+    pages, growth = proc.stdout.split()[-2:]
+    return int(pages), int(growth)
+
+
+def test_flushed_build_uses_less_memory(tmp_path):
+    pages, single = build(tmp_path, 0)
+    flushed_pages, flushed = build(tmp_path, FLUSH_PAGES)
+
+    assert flushed_pages == pages
+    assert pages > 20 * FLUSH_PAGES
+    # Single-pass holds every page until output; parts hold about FLUSH_PAGES
+    assert flushed < 0.8 * single, f"flushed +{flushed} KB vs single-pass +{single} KB"